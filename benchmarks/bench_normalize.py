@@ -0,0 +1,100 @@
+import argparse
+import os
+import sys
+import time
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import y_fin_normalize
+
+# Row-by-row conversion as done by the segregate scripts and y_fin_mini before y_fin_normalize, kept as the baseline
+def legacy_convert_suffixed(value):
+    multiplier = 1
+    if isinstance(value, str):
+        if value.endswith('T'):
+            multiplier = 1e12
+        elif value.endswith('B'):
+            multiplier = 1e9
+        elif value.endswith('M'):
+            multiplier = 1e6
+        elif value.endswith('k'):
+            multiplier = 1e3
+        return float(value[:-1]) * multiplier
+    return value
+
+def legacy_convert_pe_value(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def legacy_convert_employees(value):
+    if isinstance(value, str):
+        return int(value.replace(',', ''))
+    return value
+
+def legacy_indicator(row):
+    try:
+        share_price = float(str(row['Share Price']).replace(',', ''))
+        high = float(str(row['52 Week High']).replace(',', ''))
+        low = float(str(row['52 Week Low']).replace(',', ''))
+        if share_price > high - high * 0.05:
+            return "Close to 52 week High"
+        elif share_price < low + low * 0.05:
+            return "Close to 52 week low"
+        return ""
+    except Exception:
+        return ""
+
+def legacy_indicator_2(row):
+    try:
+        share_price = float(str(row['Share Price']).replace(',', ''))
+        moving_avg = float(str(row['50-Day Moving Average']).replace(',', ''))
+        return "Above 50 day moving avg" if share_price > moving_avg else "Below 50 day moving avg."
+    except Exception:
+        return ""
+
+def legacy_normalize(df):
+    df = df.copy()
+    df['Market Cap'] = df['Market Cap'].apply(legacy_convert_suffixed)
+    df['Enterprise Value'] = df['Enterprise Value'].apply(legacy_convert_suffixed)
+    df['PB'] = df['PB'].apply(legacy_convert_pe_value)
+    df['No. of employees'] = df['No. of employees'].apply(legacy_convert_employees)
+    df['Trailing P/E'] = df['Trailing P/E'].apply(legacy_convert_pe_value)
+    df['Indicator'] = df.apply(legacy_indicator, axis=1)
+    df['Indicator_2'] = df.apply(legacy_indicator_2, axis=1)
+    return df
+
+def vectorized_normalize(df):
+    return y_fin_normalize.add_indicators(y_fin_normalize.normalize_company_data(df))
+
+# Function to build a frame of the given size by resampling the rows of company_data.csv, with every column read as text
+def make_company_data(num_rows):
+    base = pd.read_csv(os.path.join(ROOT_DIR, "company_data.csv"), dtype=str)
+    return base.sample(num_rows, replace=True, random_state=0).reset_index(drop=True)
+
+# Function to return the best of `repeat` timings of func(df)
+def best_time(func, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark row-by-row against vectorized numeric normalization.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[500, 50000], help="frame sizes to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="timings per measurement, best one is reported")
+    args = parser.parse_args()
+
+    for num_rows in args.rows:
+        df = make_company_data(num_rows)
+        legacy = best_time(legacy_normalize, df, args.repeat)
+        vectorized = best_time(vectorized_normalize, df, args.repeat)
+        print(f"rows={num_rows:<7} legacy={legacy * 1000:9.2f} ms  vectorized={vectorized * 1000:9.2f} ms  speedup={legacy / vectorized:6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import y_fin_mini
+import y_fin_normalize
+from y_fin_charts import render_group_charts
+from y_fin_report import REPORT_LAYOUTS, group_statistics, highlight_fills_by_key, write_group_report
+from bench_scrape_pool import make_symbol_list
+from fixture_server import start_fixture_server
+from synthetic import make_company_data
+
+# Directory the JSON results are written to, one file per run
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Pipeline stages, in the order they run
+STAGES = ['scrape', 'normalize', 'group', 'workbook', 'charts']
+
+# Function to time `repeat` calls of func() and return the timings in seconds
+def time_calls(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+# Scraping: the HTTP pool against the local fixture server, without page cache or Selenium fallback
+def bench_scrape(num_rows, context):
+    df = make_symbol_list(min(num_rows, context['scrape_limit']))
+    return len(df), lambda: y_fin_mini.scrape_with_pool(df, context['workers'], base_url=context['base_url'], backend="http", fallback=False)
+
+# Numeric conversion of the scraped text and the indicator columns
+def bench_normalize(num_rows, context):
+    df = context['data'][num_rows]
+    return num_rows, lambda: y_fin_normalize.add_indicators(y_fin_normalize.normalize_company_data(df))
+
+# Grouping: the group statistics and highlighted cells of the sector and industry reports
+def bench_group(num_rows, context):
+    df = context['normalized'][num_rows]
+
+    def run():
+        group_statistics(df, ['Sector', 'Industry'])
+        highlight_fills_by_key(df, ['Sector', 'Industry'])
+    return num_rows, run
+
+# Workbook writing: the sector report without its charts
+def bench_workbook(num_rows, context):
+    df = context['normalized'][num_rows]
+    stats = group_statistics(df, ['Sector'])['Sector']
+    fills = highlight_fills_by_key(df, ['Sector'])['Sector']
+    path = os.path.join(context['work_dir'], "report.xlsx")
+    return num_rows, lambda: write_group_report(df, 'Sector', stats, fills, REPORT_LAYOUTS['Sector'], path)
+
+# Chart rendering: every sector panel drawn cold, into a fresh cache directory on each call. The share price panel
+# draws one line and legend entry per company, so only the first chart_limit rows are charted.
+def bench_charts(num_rows, context):
+    groups = {sector: data for sector, data in context['normalized'][num_rows].head(context['chart_limit']).groupby('Sector')}
+    return len(groups), lambda: render_group_charts(groups, tempfile.mkdtemp(dir=context['work_dir']), context['workers'])
+
+STAGE_FUNCTIONS = {
+    'scrape': bench_scrape,
+    'normalize': bench_normalize,
+    'group': bench_group,
+    'workbook': bench_workbook,
+    'charts': bench_charts,
+}
+
+# Function to describe the code and machine the results were measured on
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+# Function to compare a run with an earlier results file: the ratio of the median timings of every stage and size
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {(entry['stage'], entry['rows']): entry for entry in baseline['results']}
+    print(f"\nCompared with {baseline_path} (commit {baseline['environment'].get('commit')}); ratio > 1 is slower:")
+    for entry in results:
+        old = previous.get((entry['stage'], entry['rows']))
+        if old:
+            print(f"  {entry['stage']:<10} rows={entry['rows']:<7} {entry['median_s'] / old['median_s']:6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every stage of the scrape -> normalize -> report pipeline offline.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[500, 5000, 50000], help="synthetic company_data sizes")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="stages to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="timings per measurement")
+    parser.add_argument("--workers", type=int, default=4, help="scraper threads and chart processes")
+    parser.add_argument("--scrape-limit", type=int, default=500, help="maximum symbols scraped per size, as every symbol costs two requests")
+    parser.add_argument("--chart-limit", type=int, default=5000, help="maximum companies charted per size")
+    parser.add_argument("--output", default=None, help="JSON results file (default: results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier JSON results file to compare with")
+    args = parser.parse_args()
+
+    env = environment()
+    server, base_url = start_fixture_server()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            data = {num_rows: make_company_data(num_rows) for num_rows in args.rows}
+            context = {
+                'base_url': base_url,
+                'workers': args.workers,
+                'scrape_limit': args.scrape_limit,
+                'chart_limit': args.chart_limit,
+                'work_dir': work_dir,
+                'data': data,
+                'normalized': {num_rows: y_fin_normalize.normalize_company_data(df) for num_rows, df in data.items()},
+            }
+            for stage in args.stages:
+                for num_rows in args.rows:
+                    items, func = STAGE_FUNCTIONS[stage](num_rows, context)
+                    timings = time_calls(func, args.repeat)
+                    entry = {
+                        'stage': stage,
+                        'rows': num_rows,
+                        'items': items,
+                        'repeat': args.repeat,
+                        'best_s': min(timings),
+                        'median_s': statistics.median(timings),
+                        'items_per_s': items / statistics.median(timings),
+                    }
+                    results.append(entry)
+                    print(f"{stage:<10} rows={num_rows:<7} items={items:<7} best={entry['best_s'] * 1000:10.2f} ms  median={entry['median_s'] * 1000:10.2f} ms  {entry['items_per_s']:12.1f} items/s")
+    finally:
+        server.shutdown()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{env['timestamp'].replace(':', '')}-{env['commit'] or 'nocommit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({'environment': env, 'results': results}, f, indent=1)
+    print(f"Results saved to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import y_fin_mini
+from fixture_server import start_fixture_server
+
+# Function to build a symbol list of the given size in the layout of ind_nifty500list_usecase3.csv
+def make_symbol_list(num_symbols):
+    return pd.DataFrame({
+        'Company Name': [f"Company {i} Ltd." for i in range(num_symbols)],
+        'Industry': ["Financial Services"] * num_symbols,
+        'Symbol': [f"SYM{i}" for i in range(num_symbols)],
+        'Series': ["EQ"] * num_symbols,
+        'ISIN Code': [f"INE{i:09d}" for i in range(num_symbols)],
+    })
+
+# Function to time one pool run and return symbols/second
+def run_benchmark(df, num_workers, base_url, backend):
+    start = time.perf_counter()
+    if backend == "async":
+        results_df = y_fin_mini.scrape_with_asyncio(df, num_workers, base_url=base_url, rate=10000.0)
+    else:
+        results_df = y_fin_mini.scrape_with_pool(df, num_workers, base_url=base_url, backend=backend, fallback=False)
+    elapsed = time.perf_counter() - start
+    if len(results_df) != len(df):
+        print(f"Warning: only {len(results_df)} of {len(df)} symbols were scraped")
+    return len(df) / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper pool against a local HTML fixture server.")
+    parser.add_argument("--symbols", type=int, default=40, help="number of symbols to scrape per run")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="pool sizes to benchmark")
+    parser.add_argument("--backend", choices=["selenium", "http", "async"], default="selenium", help="scraping backend to benchmark")
+    args = parser.parse_args()
+
+    server, base_url = start_fixture_server()
+    try:
+        df = make_symbol_list(args.symbols)
+        for num_workers in args.workers:
+            rate = run_benchmark(df, num_workers, base_url, args.backend)
+            print(f"backend={args.backend:<8} workers={num_workers:<3} symbols={args.symbols:<5} {rate:8.2f} symbols/s")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
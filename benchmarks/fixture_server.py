@@ -0,0 +1,51 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Directory holding the saved key-statistics and profile pages
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Request handler serving (with ETag revalidation) /quote/<symbol>/key-statistics and /quote/<symbol>/profile from the saved fixtures
+class FixtureHandler(BaseHTTPRequestHandler):
+    pages = {}
+
+    def do_GET(self):
+        tab = self.path.rstrip("/").rsplit("/", 1)[-1]
+        body = self.pages.get(tab)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Keep the benchmark output readable
+    def log_message(self, format, *args):
+        pass
+
+# Function to load the fixture pages into memory
+def load_fixture_pages():
+    pages = {}
+    for tab in ("key-statistics", "profile"):
+        with open(os.path.join(FIXTURES_DIR, f"{tab}.html"), "rb") as f:
+            pages[tab] = f.read()
+    return pages
+
+# Function to start the fixture server on a free local port in a background thread; returns (server, base_url)
+def start_fixture_server():
+    FixtureHandler.pages = load_fixture_pages()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+# Sectors and industries of the Nifty 500 list, reused so synthetic groups have realistic counts
+SECTORS = ['Financial Services', 'Industrials', 'Basic Materials', 'Healthcare', 'Utilities', 'Energy', 'Consumer Defensive', 'Consumer Cyclical', 'Communication Services', 'Technology', 'Real Estate']
+INDUSTRIES = ['Financial Services', 'Diversified', 'Chemicals', 'Healthcare', 'Power', 'Oil Gas & Consumable Fuels', 'Fast Moving Consumer Goods', 'Automobile and Auto Components', 'Telecommunication', 'Information Technology', 'Realty', 'Capital Goods', 'Metals & Mining', 'Construction', 'Consumer Services', 'Consumer Durables', 'Textiles', 'Media Entertainment & Publication', 'Services', 'Construction Materials', 'Forest Materials']
+
+# Function to format magnitudes the way the quote pages do ("249.51B", "512.4M")
+def format_suffixed(values):
+    text = np.full(len(values), '', dtype=object)
+    for suffix, multiplier in (('T', 1e12), ('B', 1e9), ('M', 1e6), ('k', 1e3)):
+        pending = (text == '') & (values >= multiplier)
+        text[pending] = [f"{value / multiplier:.2f}{suffix}" for value in values[pending]]
+    pending = text == ''
+    text[pending] = [f"{value:.2f}" for value in values[pending]]
+    return text
+
+# Function to format numbers with thousands separators ("29,538.05")
+def format_number(values, decimals=2):
+    return np.array([f"{value:,.{decimals}f}" for value in values], dtype=object)
+
+# Function to generate scraped company data in the text layout of company_data.csv: num_rows companies with
+# unique tickers, suffixed magnitudes, comma-formatted prices, "N/A" placeholders and the indicator columns.
+# The same seed always produces the same frame, so benchmark results compare across commits.
+def make_company_data(num_rows, seed=0):
+    import y_fin_normalize
+
+    rng = np.random.default_rng(seed)
+    share_price = np.round(rng.lognormal(6.5, 1.2, num_rows), 2)
+    high = np.round(share_price * rng.uniform(1.0, 1.6, num_rows), 2)
+    low = np.round(share_price * rng.uniform(0.5, 1.0, num_rows), 2)
+    moving_avg = np.round(share_price * rng.uniform(0.85, 1.15, num_rows), 2)
+    market_cap = rng.lognormal(25, 1.5, num_rows)
+    trailing_pe = np.round(rng.lognormal(3.4, 0.8, num_rows), 2)
+    pb = np.round(rng.lognormal(1.2, 0.9, num_rows), 2)
+
+    df = pd.DataFrame({
+        'Company Name': [f"Synthetic Company {i} Ltd." for i in range(num_rows)],
+        'Industry': rng.choice(INDUSTRIES, num_rows),
+        'Sector': rng.choice(SECTORS, num_rows),
+        'Ticker': [f"SYN{i:06d}" for i in range(num_rows)],
+        'Share Price': format_number(share_price),
+        'Market Cap': format_suffixed(market_cap),
+        'Enterprise Value': format_suffixed(market_cap * rng.uniform(0.8, 1.4, num_rows)),
+        'Trailing P/E': np.where(rng.random(num_rows) < 0.05, 'N/A', format_suffixed(trailing_pe)),
+        'PB': np.where(rng.random(num_rows) < 0.03, 'N/A', pb.astype(str)),
+        'Beta': np.round(rng.normal(0.9, 0.4, num_rows), 2).astype(str),
+        '52 Week High': format_number(high),
+        '52 Week Low': format_number(low),
+        '50-Day Moving Average': format_number(moving_avg),
+        'No. of employees': format_number(rng.integers(50, 300000, num_rows), decimals=0),
+    })
+    return y_fin_normalize.add_indicators(df)
+
+# Function to write a synthetic company_data.csv
+def write_company_csv(path, num_rows, seed=0):
+    make_company_data(num_rows, seed).to_csv(path, index=False)
+    return path
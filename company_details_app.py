@@ -1,22 +1,66 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
+from company_details_data import CompanyData, data_version
 
-# Load your first database (Excel sheet) containing basic company details
-def load_basic_data():
-    return pd.read_csv('company_data.csv')
+# Load the basic company details and the historical data once per file modification time; the loaded data and
+# its search indexes are shared by every session and rerun instead of being re-parsed on each keystroke
+@st.cache_resource(max_entries=1)
+def load_company_data(basic_mtime, historical_mtime):
+    return CompanyData.load()
 
-# Load your second database (Excel sheet) containing historical data
-def load_historical_data():
-    return pd.read_excel('360ONE.NS.xlsx')
+# Function to get the loaded data, reloading it only when one of the files changed on disk
+def get_company_data():
+    return load_company_data(*data_version())
+
+# Function to parse an optional bound typed in the screener panel
+def parse_bound(text):
+    try:
+        return float(text.replace(',', '')) if text.strip() else None
+    except ValueError:
+        st.sidebar.write(f'Ignoring "{text}", which is not a number.')
+        return None
+
+# Screener panel in the sidebar: filters and a top-N ordering answered from the precomputed screener index
+def screener_panel(company_data):
+    screener = company_data.screener
+    st.sidebar.header('Screener')
+
+    filters = []
+    for column in ['Sector', 'Industry', 'Indicator', 'Indicator_2']:
+        if column in screener.groups:
+            selected = st.sidebar.multiselect(column, screener.groups[column].values)
+            if selected:
+                filters.append((column, 'in', selected))
+
+    numeric_column = st.sidebar.selectbox('Numeric filter', ['None'] + screener.numeric_columns)
+    if numeric_column != 'None':
+        low = parse_bound(st.sidebar.text_input(f'Minimum {numeric_column}'))
+        high = parse_bound(st.sidebar.text_input(f'Maximum {numeric_column}'))
+        if low is not None:
+            filters.append((numeric_column, '>=', low))
+        if high is not None:
+            filters.append((numeric_column, '<=', high))
+
+    sort_by = st.sidebar.selectbox('Order by', ['None'] + screener.numeric_columns)
+    descending = st.sidebar.checkbox('Largest first')
+    top = int(st.sidebar.number_input('Number of companies', min_value=1, value=20))
+    per_group = st.sidebar.selectbox('Top companies of', ['All companies', 'Sector', 'Industry'])
+
+    if st.sidebar.button('Screen'):
+        sort_by = None if sort_by == 'None' else sort_by
+        per_group = None if per_group == 'All companies' or sort_by is None else per_group
+        result = screener.query(filters, sort_by, not descending, top if sort_by else None, per_group)
+        st.write(f"**Screener Results ({len(result)} companies):**")
+        st.dataframe(result)
 
 # Main function to search for a company and display details from both sheets
 def main():
     st.title('Company Details Search')
 
     # Load basic and historical data
-    basic_data = load_basic_data()
-    historical_data = load_historical_data()
+    company_data = get_company_data()
+
+    # Screen all companies from the sidebar
+    screener_panel(company_data)
 
     # User input for company name
     company_name = st.text_input('Enter company name:')
@@ -25,38 +69,41 @@ def main():
     if st.button('Search'):
         if company_name:
             # Display details from the first sheet for the specific company
-            company_basic_details = basic_data[basic_data['Company Name'].str.contains(company_name, case=False)]
+            company_basic_details = company_data.search_basic(company_name)
             if not company_basic_details.empty:
                 st.write("**Company Details Today:**")
                 st.write(company_basic_details)
             else:
                 st.write('Company details not found in the first file.')
 
-            # Display details from the second sheet
-            company_historical_details = historical_data[historical_data['Company Name'].str.contains(company_name, case=False)]
-            if not company_historical_details.empty:
+            # Display details from the historical price store
+            historical_tickers = company_data.search_historical_tickers(company_name)
+            if historical_tickers:
                 st.write("**Company Details for analysis:**")
-                st.write(company_historical_details)
+                st.write(company_data.load_history(historical_tickers))
 
-                # Visualize historical data for the selected company from the second sheet
+                # Visualize historical data for the selected companies from their downsampled chart series,
+                # so the chart draws a fixed number of points whatever the history length; matplotlib is only
+                # imported once a chart is drawn, which keeps the app's cold start short
+                import matplotlib.pyplot as plt
                 fig, ax = plt.subplots(figsize=(10, 6))
-                ax.plot(company_historical_details['Date'], company_historical_details['Open'], label='Open')
-                ax.plot(company_historical_details['Date'], company_historical_details['Close'], label='Close')
-                ax.plot(company_historical_details['Date'], company_historical_details['High'], label='High')
-                ax.plot(company_historical_details['Date'], company_historical_details['Low'], label='Low')
+                for ticker in historical_tickers:
+                    for column, (dates, prices) in company_data.history.chart_series(ticker).items():
+                        ax.plot(dates, prices, label=column if len(historical_tickers) == 1 else f"{ticker} {column}")
                 ax.set_xlabel('Date')
                 ax.set_ylabel('Price')
                 ax.set_title('Historical Prices of Companies')
                 ax.legend()
                 ax.tick_params(axis='x', rotation=45)
                 st.pyplot(fig)
+                plt.close(fig)
 
                 # Print insights
                 st.write("**Insights:**")
                 st.write("- The graph shows the historical prices (Open, Close, High, Low) of the selected company over time.")
                 st.write("- You can observe the fluctuations and trends in the stock prices.")
             else:
-                st.write('Company not found in the second file.')
+                st.write('Company not found in the historical price store.')
         else:
             st.write('Please enter a company name.')
 
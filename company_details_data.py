@@ -0,0 +1,86 @@
+import os
+import re
+import pandas as pd
+from y_fin_history import HISTORY_DIR, INDEX_FILE, HistoryStore, import_history_file
+from y_fin_normalize import load_company_data
+from y_fin_screener import ScreenerIndex
+
+# Default data files of the company details app; the single-company workbook seeds an empty historical price store
+BASIC_DATA_PATH = 'company_data.csv'
+HISTORICAL_DATA_PATH = '360ONE.NS.xlsx'
+
+# Length of the substrings indexed by NgramIndex
+NGRAM_SIZE = 3
+
+# Function to normalize a company name or ticker for searching: lower case, single spaces
+def normalize_text(text):
+    return re.sub(r'\s+', ' ', str(text)).strip().lower()
+
+# Function to return the set of n-grams of a normalized string
+def ngrams(text, n=NGRAM_SIZE):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+# Inverted n-gram index answering case-insensitive substring queries over a list of keys without scanning them all
+class NgramIndex:
+    def __init__(self, keys):
+        self.keys = [normalize_text(key) for key in keys]
+        self.postings = {}
+        for position, key in enumerate(self.keys):
+            for gram in ngrams(key):
+                self.postings.setdefault(gram, set()).add(position)
+
+    # Function to return the positions of the keys containing the query, in key order
+    def search(self, query):
+        query = normalize_text(query)
+        if not query:
+            return []
+        if len(query) < NGRAM_SIZE:
+            candidates = range(len(self.keys))
+        else:
+            posting_lists = sorted((self.postings.get(gram, set()) for gram in ngrams(query)), key=len)
+            candidates = set.intersection(*posting_lists) if posting_lists else set()
+        # Posting lists only prove the n-grams occur; confirm the whole query is a substring
+        return sorted(position for position in candidates if query in self.keys[position])
+
+# Memory-resident data of the app: the latest company details (normalized and compacted by load_company_data),
+# searchable by name or ticker and screenable by column values, and the historical price store of every ticker,
+# searchable the same way
+class CompanyData:
+    def __init__(self, basic_data, history):
+        self.basic_data = basic_data.reset_index(drop=True)
+        search_keys = self.basic_data['Company Name'].astype(str)
+        if 'Ticker' in self.basic_data:
+            search_keys = search_keys + ' ' + self.basic_data['Ticker'].astype(str)
+        self.basic_index = NgramIndex(search_keys)
+        self.screener = ScreenerIndex(self.basic_data)
+
+        self.history = history
+        self.historical_tickers = history.tickers()
+        self.historical_index = NgramIndex([f"{history.company_name(ticker)} {ticker}" for ticker in self.historical_tickers])
+
+    # Function to load the company details and open the historical price store
+    @classmethod
+    def load(cls, basic_path=BASIC_DATA_PATH, history_dir=HISTORY_DIR, historical_path=HISTORICAL_DATA_PATH):
+        history = HistoryStore(history_dir)
+        if not history.tickers() and os.path.exists(historical_path):
+            print(f"Seeding the historical price store from {historical_path}...")
+            import_history_file(historical_path, store=history)
+        return cls(load_company_data(basic_path), history)
+
+    # Function to find the company details whose name or ticker contains the query
+    def search_basic(self, query):
+        return self.basic_data.iloc[self.basic_index.search(query)]
+
+    # Function to find the tickers with stored history whose company name or ticker contains the query
+    def search_historical_tickers(self, query):
+        return [self.historical_tickers[position] for position in self.historical_index.search(query)]
+
+    # Function to load the historical prices of some tickers between start and end
+    def load_history(self, tickers, start=None, end=None):
+        frames = [self.history.load(ticker, start, end) for ticker in tickers]
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+# Function to return the modification times used as the cache key of the loaded data
+def data_version(basic_path=BASIC_DATA_PATH, history_dir=HISTORY_DIR):
+    index_path = os.path.join(history_dir, INDEX_FILE)
+    return os.path.getmtime(basic_path), os.path.getmtime(index_path) if os.path.exists(index_path) else 0
@@ -0,0 +1,148 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from y_fin_fields import BASE_URL, TAB_FIELDS, ScrapeResult, quote_url
+from y_fin_http import REQUEST_HEADERS, extract_fields
+from y_fin_metrics import logger, metrics
+
+# Raised for responses worth retrying (rate limited or server side errors)
+class RetryableHTTPError(Exception):
+    pass
+
+# Errors after which a request is retried with backoff
+RETRYABLE_ERRORS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError, RetryableHTTPError)
+
+# Token bucket allowing `rate` requests per second with bursts of up to `capacity` requests
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# One token bucket per host, created on first use
+class HostRateLimiter:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+
+    async def acquire(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        await self.buckets[host].acquire()
+
+# Function to download one URL, retrying transient failures with full-jitter exponential backoff; returns (status, body, headers)
+async def fetch_with_retry(session, limiter, url, retries=3, headers=None, backoff_base=0.5, backoff_max=30.0):
+    for attempt in range(retries + 1):
+        with metrics.timer("rate_limit_wait"):
+            await limiter.acquire(url)
+        try:
+            with metrics.timer("page_load"):
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 429 or response.status >= 500:
+                        raise RetryableHTTPError(f"HTTP {response.status} for {url}")
+                    response.raise_for_status()
+                    return response.status, await response.read(), response.headers
+        except RETRYABLE_ERRORS as e:
+            if attempt == retries:
+                raise
+            delay = random.uniform(0, min(backoff_max, backoff_base * 2 ** attempt))
+            metrics.count("page_retries")
+            logger.info("event=retry url=%s delay_s=%.2f error=%r", url, delay, e)
+            await asyncio.sleep(delay)
+
+# Function to fetch one quote tab, serving fresh pages from the PageCache and revalidating stale ones
+async def fetch_tab(session, limiter, symbol, tab, base_url=BASE_URL, retries=3, cache=None):
+    cached = cache.lookup(symbol, tab) if cache else None
+    if cached and cached.fresh:
+        return cached.body
+
+    status, body, headers = await fetch_with_retry(session, limiter, quote_url(symbol, tab, base_url), retries, cached.conditional_headers() if cached else None)
+    if cached and status == 304:
+        cache.refresh(symbol, tab)
+        return cached.body
+    if cache:
+        cache.store(symbol, tab, body, headers.get("ETag"), headers.get("Last-Modified"))
+    return body
+
+# Function to fetch the quote tabs of a symbol concurrently and extract its fields into a ScrapeResult; a tab that
+# fails to download or parse only loses its own fields, and the symbol is only failed when every tab did not download
+async def scrape_symbol_async(session, limiter, symbol, base_url=BASE_URL, retries=3, cache=None, tab_fields=TAB_FIELDS):
+    pages = await asyncio.gather(*(fetch_tab(session, limiter, symbol, tab, base_url, retries, cache) for tab in tab_fields), return_exceptions=True)
+    errors = [page for page in pages if isinstance(page, Exception)]
+    if errors and len(errors) == len(pages):
+        raise errors[0]
+    result = ScrapeResult()
+    for (tab, fields), page in zip(tab_fields.items(), pages):
+        if isinstance(page, Exception):
+            logger.warning("event=page_load_failed symbol=%s tab=%s error=%r", symbol, tab, page)
+            result.tab_failed(fields)
+            continue
+        try:
+            values = extract_fields(tab, page, fields)
+        except Exception as e:
+            # An empty or unparsable body is dropped from the cache, so a retry downloads it again
+            logger.warning("event=page_parse_failed symbol=%s tab=%s error=%r", symbol, tab, e)
+            if cache:
+                cache.discard(symbol, tab)
+            result.tab_failed(fields)
+            continue
+        for name, value in values.items():
+            result.set(name, value)
+    return result
+
+# Function to scrape many symbols concurrently; failed symbols are collected in a dead-letter list and retried
+# after the main pass. on_result(symbol, result), if given, is called as each symbol completes.
+# Returns ({symbol: ScrapeResult}, [symbols that still failed]).
+async def scrape_symbols_async(symbols, base_url=BASE_URL, concurrency=20, rate=5.0, burst=10, retries=3, dead_letter_passes=1, timeout=20, cache=None, on_result=None, tab_fields=TAB_FIELDS):
+    limiter = HostRateLimiter(rate, burst)
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {}
+    dead_letter = []
+
+    async def scrape_one(session, symbol):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                results[symbol] = await scrape_symbol_async(session, limiter, symbol, base_url, retries, cache, tab_fields)
+                metrics.record("symbol", time.perf_counter() - start)
+                if on_result:
+                    on_result(symbol, results[symbol])
+            except Exception as e:
+                logger.warning("event=symbol_failed symbol=%s error=%r", symbol, e)
+                dead_letter.append(symbol)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(headers=REQUEST_HEADERS, connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        pending = list(symbols)
+        for attempt in range(dead_letter_passes + 1):
+            if attempt > 0:
+                logger.info("event=dead_letter_retry symbols=%d pass=%d of=%d", len(pending), attempt, dead_letter_passes)
+            dead_letter = []
+            await asyncio.gather(*(scrape_one(session, symbol) for symbol in pending))
+            if not dead_letter:
+                break
+            pending = dead_letter
+    return results, dead_letter
+
+# Blocking entry point used by y_fin_mini.main()
+def run_async_scrape(symbols, base_url=BASE_URL, **options):
+    return asyncio.run(scrape_symbols_async(symbols, base_url, **options))
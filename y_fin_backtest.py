@@ -0,0 +1,119 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from y_fin_predict import LAGS, feature_windows, load_price_table
+from y_fin_snapshots import SNAPSHOT_DIR, read_latest_snapshot
+
+# Models the backtest can compare; "last_price" predicts no change and is the baseline to beat
+MODELS = ['random_forest', 'last_price']
+
+# Feature windows shared by the folds of a worker process, set once by init_fold_worker instead of being sent with every fold
+FOLD_DATA = {}
+
+# Function to make the feature windows available to the folds run in this process
+def init_fold_worker(X, y, dates):
+    FOLD_DATA['X'], FOLD_DATA['y'], FOLD_DATA['dates'] = X, y, dates
+
+# Function to run one expanding-window fold: train on every window whose target date comes before `cutoff`,
+# predict the windows whose target date is in [cutoff, cutoff + step). Returns (test row positions, predictions).
+def run_fold(cutoff, step, model_name, n_estimators=100, random_state=42):
+    X, y, dates = FOLD_DATA['X'], FOLD_DATA['y'], FOLD_DATA['dates']
+    train = (dates < cutoff) & np.isfinite(y)
+    test = np.flatnonzero((dates >= cutoff) & (dates < cutoff + step) & np.isfinite(y))
+    if model_name == 'last_price':
+        return test, np.ones(len(test))
+    from sklearn.ensemble import RandomForestRegressor
+
+    # Folds already run in parallel, so each model uses a single core
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state, n_jobs=1)
+    model.fit(X[train], y[train])
+    return test, model.predict(X[test]) if len(test) else np.empty(0)
+
+# Function to run the walk-forward backtest of a model over a ticker x date price table. The feature windows are
+# built once and shared by every fold; folds run in parallel. Returns one row per predicted (ticker, date) with
+# the actual and predicted share price.
+def walk_forward(wide, model_name='random_forest', lags=LAGS, min_train_dates=20, step=1, n_estimators=100, max_workers=None):
+    X, y, ticker_positions, date_positions = feature_windows(wide, lags)
+    cutoffs = list(range(lags + min_train_dates, wide.shape[1], step))
+    if not cutoffs:
+        raise ValueError(f"Need more than {lags + min_train_dates} snapshot dates for the backtest")
+    print(f"Running {len(cutoffs)} folds of {model_name}...")
+
+    tests, predictions = [], []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_fold_worker, initargs=(X, y, date_positions)) as executor:
+        folds = [executor.submit(run_fold, cutoff, step, model_name, n_estimators) for cutoff in cutoffs]
+        for fold in folds:
+            test, predicted = fold.result()
+            tests.append(test)
+            predictions.append(predicted)
+    test = np.concatenate(tests)
+
+    # The windows are scaled by the last known price; scale the predictions back to prices
+    prices = wide.to_numpy(dtype='float64')
+    last_price = prices[ticker_positions[test], date_positions[test] - 1]
+    return pd.DataFrame({
+        'Ticker': wide.index[ticker_positions[test]].astype(str),
+        'date': wide.columns[date_positions[test]],
+        'Share Price': y[test] * last_price,
+        'Predicted Share Price': np.concatenate(predictions) * last_price,
+    })
+
+# Function to compute the error metrics of backtest predictions per group
+def error_metrics(results, by):
+    errors = results.assign(
+        error=results['Predicted Share Price'] - results['Share Price'],
+        abs_error=lambda df: df['error'].abs(),
+        squared_error=lambda df: df['error'] ** 2,
+        abs_pct_error=lambda df: df['abs_error'] / df['Share Price'].abs() * 100,
+    )
+    metrics = errors.groupby(by, observed=True).agg(
+        Predictions=('error', 'size'),
+        MAE=('abs_error', 'mean'),
+        RMSE=('squared_error', 'mean'),
+        MAPE=('abs_pct_error', 'mean'),
+    )
+    metrics['RMSE'] = np.sqrt(metrics['RMSE'])
+    return metrics.reset_index()
+
+# Function to backtest several models on the stored snapshots and report their metrics per ticker and per sector.
+# Returns {sheet name: frame}.
+def backtest(models=MODELS, start=None, end=None, lags=LAGS, min_train_dates=20, step=1, n_estimators=100, max_workers=None, directory=SNAPSHOT_DIR):
+    wide = load_price_table(start, end, directory=directory)
+    sectors = read_latest_snapshot(['Ticker', 'Sector'], directory).drop_duplicates('Ticker').set_index('Ticker')['Sector']
+    results = []
+    for model_name in models:
+        result = walk_forward(wide, model_name, lags, min_train_dates, step, n_estimators, max_workers)
+        results.append(result.assign(Model=model_name, Sector=result['Ticker'].map(sectors)))
+    results = pd.concat(results, ignore_index=True)
+    return {
+        'Summary': error_metrics(results, ['Model']),
+        'By Sector': error_metrics(results, ['Model', 'Sector']),
+        'By Ticker': error_metrics(results, ['Model', 'Ticker']),
+    }
+
+# Command line: backtest the models and write the metrics to a workbook
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the share price model over the snapshot store.")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot store directory")
+    parser.add_argument("--start", default=None, help="first date, YYYY-MM-DD")
+    parser.add_argument("--end", default=None, help="last date, YYYY-MM-DD")
+    parser.add_argument("--models", nargs="+", choices=MODELS, default=MODELS, help="models to compare")
+    parser.add_argument("--lags", type=int, default=LAGS, help="prior prices per feature window")
+    parser.add_argument("--min-train", type=int, default=20, help="dates of history before the first fold")
+    parser.add_argument("--step", type=int, default=1, help="dates predicted by each fold")
+    parser.add_argument("--trees", type=int, default=100, help="number of trees")
+    parser.add_argument("--workers", type=int, default=None, help="parallel folds (default: all cores)")
+    parser.add_argument("--output", default="backtest_metrics.xlsx", help=".xlsx file to write")
+    args = parser.parse_args(argv)
+
+    sheets = backtest(args.models, args.start, args.end, args.lags, args.min_train, args.step, args.trees, args.workers, args.dir)
+    with pd.ExcelWriter(args.output) as writer:
+        for name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=name, index=False)
+    print(sheets['Summary'].to_string(index=False))
+    print(f"Backtest metrics saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
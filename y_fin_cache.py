@@ -0,0 +1,123 @@
+import sqlite3
+import threading
+import time
+
+# Default location of the on-disk page cache
+DEFAULT_CACHE_PATH = "page_cache.sqlite3"
+
+# Seconds a cached page stays fresh, per quote page tab: statistics move intraday, profiles barely change
+DEFAULT_TTLS = {
+    'key-statistics': 4 * 3600,
+    'profile': 7 * 24 * 3600,
+}
+
+# Upper bound on the total size of the cached pages before least recently used pages are evicted
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# One cached page; `fresh` tells whether it is still within its tab's TTL
+class CachedPage:
+    def __init__(self, body, fetched_at, etag, last_modified, fresh):
+        self.body = body
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh = fresh
+
+    # Headers asking the server to answer 304 Not Modified if the page did not change
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+# Size-bounded LRU cache of quote pages keyed by symbol and tab, stored in SQLite and shared by all scraper threads
+class PageCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS pages (
+            symbol TEXT NOT NULL,
+            tab TEXT NOT NULL,
+            body BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            fetched_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            PRIMARY KEY (symbol, tab))""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)")
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    # Function to look up a page; returns a CachedPage (fresh or stale) or None
+    def lookup(self, symbol, tab):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT body, fetched_at, etag, last_modified FROM pages WHERE symbol = ? AND tab = ?", (symbol, tab)).fetchone()
+            if row is None:
+                return None
+            body, fetched_at, etag, last_modified = row
+            fresh = now - fetched_at < self.ttls.get(tab, 0)
+            if fresh:
+                self.hits += 1
+                self.conn.execute("UPDATE pages SET accessed_at = ? WHERE symbol = ? AND tab = ?", (now, symbol, tab))
+                self.conn.commit()
+            return CachedPage(body, fetched_at, etag, last_modified, fresh)
+
+    # Function to store a freshly downloaded page and evict old pages if the cache grew past max_bytes
+    def store(self, symbol, tab, body, etag=None, last_modified=None):
+        now = time.time()
+        with self.lock:
+            self.misses += 1
+            self.conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (symbol, tab, body, len(body), now, now, etag, last_modified))
+            self._evict()
+            self.conn.commit()
+
+    # Function to mark a stale page as fresh again after the server answered 304 Not Modified
+    def refresh(self, symbol, tab):
+        now = time.time()
+        with self.lock:
+            self.revalidated += 1
+            self.conn.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE symbol = ? AND tab = ?", (now, now, symbol, tab))
+            self.conn.commit()
+
+    # Function to drop a page that could not be parsed, so the next lookup downloads it again
+    def discard(self, symbol, tab):
+        with self.lock:
+            self.conn.execute("DELETE FROM pages WHERE symbol = ? AND tab = ?", (symbol, tab))
+            self.conn.commit()
+
+    # Delete least recently used pages until the total size fits in max_bytes; caller holds the lock
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for symbol, tab, size in self.conn.execute("SELECT symbol, tab, size FROM pages ORDER BY accessed_at").fetchall():
+            self.conn.execute("DELETE FROM pages WHERE symbol = ? AND tab = ?", (symbol, tab))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    # Function to return the hit/miss counters of this run
+    def stats(self):
+        lookups = self.hits + self.misses + self.revalidated
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.revalidated) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,96 @@
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# Directory of the rendered chart cache, one PNG per distinct group data
+CHART_CACHE_DIR = "chart_cache"
+
+# Columns the group charts are drawn from; only these are hashed and sent to the workers
+CHART_COLUMNS = ['Ticker', 'Market Cap', 'Trailing P/E', 'Share Price']
+
+# Bump when the drawing code changes, so cached images are redrawn
+CHART_VERSION = 2
+
+# Groups with at most this many companies get the correlation values written in the heatmap cells
+HEATMAP_ANNOTATE_LIMIT = 12
+
+# Function to compute the cache key of a group's chart from the data it is drawn from
+def chart_key(data, correlation=None):
+    digest = hashlib.sha256(f"v{CHART_VERSION}:{','.join(CHART_COLUMNS)}".encode())
+    digest.update(pd.util.hash_pandas_object(data[CHART_COLUMNS], index=False).to_numpy().tobytes())
+    if correlation is not None:
+        digest.update(",".join(correlation.columns).encode())
+        digest.update(correlation.to_numpy().tobytes())
+    return digest.hexdigest()
+
+# Function to draw the 2x2 chart panel of one group and return it as PNG bytes; runs in a worker process.
+# `correlation` is the group's ticker x ticker return correlation (see y_fin_correlation), or None without price history.
+def render_group_chart(data, correlation=None):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    try:
+        # Market Cap Distribution
+        sns.histplot(data=data, x='Market Cap', bins=10, ax=axes[0, 0])
+        axes[0, 0].set_title('Market Cap Distribution')
+
+        # Trailing P/E Distribution
+        sns.histplot(data=data, x='Trailing P/E', bins=10, ax=axes[0, 1])
+        axes[0, 1].set_title('Trailing P/E Distribution')
+
+        # Share Price Trends
+        for ticker, share_price in data.groupby('Ticker')['Share Price']:
+            axes[1, 0].plot(share_price, label=ticker)
+        axes[1, 0].set_title('Share Price Trends')
+        axes[1, 0].legend()
+
+        # Correlation Heatmap of the daily returns
+        if correlation is not None and len(correlation) > 1:
+            sns.heatmap(correlation, annot=len(correlation) <= HEATMAP_ANNOTATE_LIMIT, cmap='coolwarm', vmin=-1, vmax=1, fmt=".2f", ax=axes[1, 1])
+        else:
+            axes[1, 1].text(0.5, 0.5, "Not enough price history", ha='center', va='center')
+            axes[1, 1].set_axis_off()
+        axes[1, 1].set_title('Correlation Heatmap')
+
+        # Adjust layout
+        fig.tight_layout()
+
+        image_data = io.BytesIO()
+        fig.savefig(image_data, format="png")
+        return image_data.getvalue()
+    finally:
+        plt.close(fig)
+
+# Function to return the PNG bytes of every group chart ({group name: data} -> {group name: bytes}).
+# Charts whose data did not change since they were last drawn come from the cache; the rest are drawn in parallel.
+# `correlations` ({group name: frame}) adds each group's correlation heatmap.
+def render_group_charts(groups, cache_dir=CHART_CACHE_DIR, max_workers=None, correlations=None):
+    correlations = correlations or {}
+    os.makedirs(cache_dir, exist_ok=True)
+    images = {}
+    pending = {}
+    for name, data in groups.items():
+        path = os.path.join(cache_dir, f"{chart_key(data, correlations.get(name))}.png")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                images[name] = f.read()
+        else:
+            pending[name] = (path, data[CHART_COLUMNS], correlations.get(name))
+
+    if pending:
+        print(f"Rendering {len(pending)} of {len(groups)} charts ({len(groups) - len(pending)} cached)...")
+        names = list(pending)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for name, image in zip(names, executor.map(render_group_chart, [pending[name][1] for name in names], [pending[name][2] for name in names])):
+                path = pending[name][0]
+                temporary = path + ".tmp"
+                with open(temporary, "wb") as f:
+                    f.write(image)
+                os.replace(temporary, path)
+                images[name] = image
+    return images
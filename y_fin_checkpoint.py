@@ -0,0 +1,81 @@
+import datetime
+import json
+import os
+import threading
+import pandas as pd
+
+# Directory holding one append-only checkpoint file per scrape date
+CHECKPOINT_DIR = "checkpoints"
+
+# Function to build the path of the checkpoint file for a scrape date (today by default)
+def checkpoint_path(run_date=None, directory=CHECKPOINT_DIR):
+    run_date = run_date or datetime.date.today()
+    return os.path.join(directory, f"company_data_{run_date:%Y-%m-%d}.jsonl")
+
+# Append-only JSONL writer shared by all scraper threads; every row is flushed as soon as it is written,
+# so a crash loses at most the row being written
+class CheckpointWriter:
+    def __init__(self, path, columns, truncate=False):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.columns = columns
+        self.lock = threading.Lock()
+        self.file = open(path, "w" if truncate else "a", encoding="utf-8")
+        self.rows_written = 0
+
+        # A crash may have left a partial last line; start on a fresh line so it stays the only bad record
+        if self.file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write("\n")
+
+    def write_row(self, values):
+        line = json.dumps(dict(zip(self.columns, values)), ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+            self.rows_written += 1
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+# Function to read a checkpoint into a columnar buffer ({column: [values]}); a truncated last line from a crash is skipped
+def read_checkpoint_columns(path, columns):
+    buffer = {column: [] for column in columns}
+    if not os.path.exists(path):
+        return buffer
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            for column in columns:
+                buffer[column].append(record.get(column))
+    return buffer
+
+# Function to return the tickers already present in a checkpoint
+def completed_symbols(path, columns):
+    return set(read_checkpoint_columns(path, columns)['Ticker'])
+
+# Function to return, for every ticker of a checkpoint, the given fields that still have no value: {ticker: [fields]}
+def incomplete_symbols(path, columns, fields):
+    results_df = load_checkpoint_frame(path, columns)
+    missing = results_df[list(fields)].isna()
+    return {ticker: list(missing.columns[row]) for ticker, row in zip(results_df['Ticker'], missing.to_numpy()) if row.any()}
+
+# Function to build the results frame once from a checkpoint, with one row per ticker in the order of `symbols`.
+# A ticker written more than once (e.g. re-fetched tabs) gets the last non-null value of every column, so partial
+# re-fetches fill in the fields the earlier rows were missing.
+def load_checkpoint_frame(path, columns, symbols=None):
+    results_df = pd.DataFrame(read_checkpoint_columns(path, columns), columns=columns)
+    if results_df['Ticker'].duplicated().any():
+        results_df = results_df.groupby('Ticker', sort=False).last().reset_index()[columns]
+    if symbols is not None:
+        position = {symbol: i for i, symbol in enumerate(symbols)}
+        results_df = results_df.iloc[results_df['Ticker'].map(position).fillna(len(position)).argsort(kind="stable")]
+    return results_df.reset_index(drop=True)
@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from y_fin_panel import load_panel, wide_panel
+from y_fin_snapshots import SNAPSHOT_DIR, SNAPSHOT_FILE, list_snapshot_dates, partition_dir, to_date
+
+# Directory of the cached matrices, one date=YYYY-MM-DD sub-directory per snapshot date
+CORRELATION_DIR = "correlation_cache"
+
+# Number of daily returns the matrices are computed from
+CORRELATION_BARS = 252
+
+# Minimum number of common returns for a pair to get a value
+MIN_PERIODS = 20
+
+# Rows of the returns matrix multiplied at a time, so the temporaries stay block_size x tickers
+BLOCK_SIZE = 1024
+
+# Trading days per year, to annualize the volatility
+YEAR_BARS = 252
+
+# Bump when the computation changes, so cached matrices are recomputed
+CORRELATION_VERSION = 1
+
+# Function to compute the daily returns of a ticker x date price table as a float32 ticker x return matrix;
+# a return next to a missing price is NaN
+def returns_matrix(wide):
+    prices = wide.to_numpy(dtype='float32')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = prices[:, 1:] / prices[:, :-1] - 1
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+# Function to compute the ticker x ticker covariance and correlation of a returns matrix in float32, block_size rows
+# at a time. Missing returns count as zero and every statistic is taken over the returns both tickers have, as in
+# pandas' pairwise DataFrame.cov/corr, so a block is a handful of matrix products instead of one pandas call per pair;
+# returns are centered on each ticker's own mean first to keep float32 sums accurate. Pairs with fewer than
+# min_periods common returns are NaN.
+def blocked_covariance(returns, min_periods=MIN_PERIODS, block_size=BLOCK_SIZE):
+    valid = ~np.isnan(returns)
+    means = np.where(valid, returns, 0).sum(axis=1) / np.maximum(valid.sum(axis=1), 1)
+    centered = np.where(valid, returns - means[:, None], 0).astype('float32')
+    squared = centered * centered
+    present = valid.astype('float32')
+
+    covariance = np.empty((len(returns), len(returns)), dtype='float32')
+    correlation = np.empty_like(covariance)
+    for start in range(0, len(returns), block_size):
+        stop = min(start + block_size, len(returns))
+        overlap = present[start:stop] @ present.T
+        sum_x = centered[start:stop] @ present.T
+        sum_y = present[start:stop] @ centered.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            products = centered[start:stop] @ centered.T - sum_x * sum_y / overlap
+            spread_x = squared[start:stop] @ present.T - sum_x * sum_x / overlap
+            spread_y = present[start:stop] @ squared.T - sum_y * sum_y / overlap
+            block_covariance = products / (overlap - 1)
+            block_correlation = np.clip(products / np.sqrt(spread_x * spread_y), -1, 1)
+        too_short = overlap < max(min_periods, 2)
+        block_covariance[too_short] = np.nan
+        block_correlation[too_short] = np.nan
+        covariance[start:stop] = block_covariance
+        correlation[start:stop] = block_correlation
+    return covariance, correlation
+
+# Correlation and covariance of the daily returns of every ticker of the universe, computed once and sliced per group
+class CorrelationMatrix:
+    def __init__(self, tickers, covariance, correlation, snapshot_date=None):
+        self.tickers = list(tickers)
+        self.covariance = covariance
+        self.correlation = correlation
+        self.snapshot_date = snapshot_date
+        self.position = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    # Function to return the positions of the given tickers that have a return history, in the given order
+    def positions(self, tickers):
+        positions = [self.position[ticker] for ticker in tickers if ticker in self.position]
+        return np.array([i for i in positions if not np.isnan(self.covariance[i, i])], dtype='int64')
+
+    # Function to return the ticker x ticker correlation (or covariance) frame of a group of tickers
+    def frame(self, tickers, values='correlation'):
+        positions = self.positions(tickers)
+        matrix = getattr(self, values)
+        labels = [self.tickers[i] for i in positions]
+        return pd.DataFrame(np.asarray(matrix[np.ix_(positions, positions)]), index=labels, columns=labels)
+
+    # Function to summarize a group of tickers: how many have a history, their average pairwise correlation
+    # and their average annualized volatility
+    def summary(self, tickers):
+        positions = self.positions(tickers)
+        block = np.asarray(self.correlation[np.ix_(positions, positions)], dtype='float64')
+        pairs = block[~np.eye(len(positions), dtype=bool)]
+        pairs = pairs[~np.isnan(pairs)]
+        volatility = np.sqrt(np.asarray(self.covariance[positions, positions], dtype='float64') * YEAR_BARS)
+        return {
+            'Companies with History': len(positions),
+            'Average Correlation': pairs.mean() if len(pairs) else np.nan,
+            'Average Volatility': volatility.mean() if len(volatility) else np.nan,
+        }
+
+    # Function to write the matrices as .npy files plus a metadata file, so they can be memory-mapped back
+    def save(self, target_dir, meta):
+        os.makedirs(target_dir, exist_ok=True)
+        np.save(os.path.join(target_dir, "covariance.npy"), self.covariance)
+        np.save(os.path.join(target_dir, "correlation.npy"), self.correlation)
+        meta_path = os.path.join(target_dir, "meta.json")
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(dict(meta, tickers=self.tickers), f, ensure_ascii=False)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    # Function to open saved matrices without reading them into memory; returns (matrix, meta) or None
+    @classmethod
+    def load(cls, target_dir):
+        try:
+            with open(os.path.join(target_dir, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            covariance = np.load(os.path.join(target_dir, "covariance.npy"), mmap_mode='r')
+            correlation = np.load(os.path.join(target_dir, "correlation.npy"), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        return cls(meta['tickers'], covariance, correlation, to_date(meta['snapshot_date'])), meta
+
+# Function to compute the matrices from the last `bars` daily returns of the snapshot store up to a snapshot date
+def compute_correlation(snapshot_date, bars=CORRELATION_BARS, directory=SNAPSHOT_DIR):
+    dates = [d for d in list_snapshot_dates(directory) if d <= snapshot_date][-(bars + 1):]
+    wide = wide_panel(load_panel(['Share Price'], dates[0], dates[-1], dtype='float32', directory=directory))
+    covariance, correlation = blocked_covariance(returns_matrix(wide))
+    return CorrelationMatrix(wide.index.astype(str), covariance, correlation, snapshot_date)
+
+# Function to return the matrices of a snapshot date (latest by default) from the cache, computing and caching them
+# when the cache is missing or older than the snapshot; None when the store holds no snapshot up to that date
+def load_correlation(snapshot_date=None, bars=CORRELATION_BARS, directory=SNAPSHOT_DIR, cache_dir=CORRELATION_DIR):
+    dates = list_snapshot_dates(directory)
+    snapshot_date = to_date(snapshot_date) or (dates[-1] if dates else None)
+    if snapshot_date is None or not any(d <= snapshot_date for d in dates):
+        return None
+
+    # A re-scraped snapshot replaces its partition file, which invalidates the matrices of its date
+    source = os.stat(os.path.join(partition_dir(snapshot_date, directory), SNAPSHOT_FILE)).st_mtime_ns if snapshot_date in dates else None
+    meta = {'snapshot_date': snapshot_date.isoformat(), 'bars': bars, 'version': CORRELATION_VERSION, 'source': source}
+    target_dir = os.path.join(cache_dir, f"date={snapshot_date:%Y-%m-%d}")
+    cached = CorrelationMatrix.load(target_dir)
+    if cached is not None and all(cached[1].get(name) == value for name, value in meta.items()):
+        return cached[0]
+
+    matrix = compute_correlation(snapshot_date, bars, directory)
+    matrix.save(target_dir, meta)
+    return matrix
+
+# Function to slice the correlation frame of every group of a grouping key: {group: frame}
+def group_correlations(matrix, df, key):
+    return {group: matrix.frame(tickers) for group, tickers in df.groupby(key)['Ticker']}
+
+# Function to summarize every group of a grouping key, one row per group (see CorrelationMatrix.summary)
+def correlation_summary(matrix, df, key):
+    rows = {group: matrix.summary(tickers) for group, tickers in df.groupby(key)['Ticker']}
+    return pd.DataFrame.from_dict(rows, orient='index').rename_axis(key)
+
+# Command line: compute (or refresh the cache of) the matrices of a snapshot date and print the per-group summary
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute the return correlation and covariance of every ticker from the snapshot store.")
+    parser.add_argument("--date", default=None, help="last snapshot date, YYYY-MM-DD (default: latest)")
+    parser.add_argument("--bars", type=int, default=CORRELATION_BARS, help="number of daily returns")
+    parser.add_argument("--by", default="Sector", help="grouping key of the summary")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR, help="Parquet snapshot store")
+    parser.add_argument("--cache-dir", default=CORRELATION_DIR, help="directory of the cached matrices")
+    args = parser.parse_args(argv)
+
+    matrix = load_correlation(args.date, args.bars, args.snapshot_dir, args.cache_dir)
+    if matrix is None:
+        parser.error("the snapshot store holds no snapshot up to that date")
+    from y_fin_snapshots import read_snapshot
+    df = read_snapshot(matrix.snapshot_date, ['Ticker', args.by], directory=args.snapshot_dir)
+    print(f"Correlation of {len(matrix.tickers)} tickers up to {matrix.snapshot_date}:")
+    print(correlation_summary(matrix, df, args.by).to_string())
+
+if __name__ == "__main__":
+    main()
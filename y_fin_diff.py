@@ -0,0 +1,157 @@
+import argparse
+import datetime
+import os
+import numpy as np
+import pandas as pd
+
+import y_fin_snapshots
+from y_fin_normalize import normalize_company_data
+
+# Directory holding one change set per snapshot date
+CHANGES_DIR = "changes"
+
+# Numeric columns compared between two scrapes
+NUMERIC_COLUMNS = ['Share Price', 'Market Cap', 'Enterprise Value', 'Trailing P/E', 'PB', 'Beta', '52 Week High', '52 Week Low', '50-Day Moving Average', 'No. of employees']
+
+# Text columns compared between two scrapes; a missing value and an empty string are the same
+TEXT_COLUMNS = ['Company Name', 'Industry', 'Sector', 'Indicator', 'Indicator_2']
+
+# Columns of a change set, one row per ticker that was added, removed or changed
+CHANGE_COLUMNS = ['Ticker', 'Company Name', 'Sector', 'Industry', 'Previous Sector', 'Previous Industry', 'Change', 'Changed Columns', 'Previous Share Price', 'Share Price', 'Price Change %', 'Previous Indicator', 'Indicator', 'Previous Indicator_2', 'Indicator_2', 'Crossed Above 50-DMA', 'Crossed Below 50-DMA', 'Near 52 Week High', 'Near 52 Week Low']
+
+# Function to index a scrape by ticker with numeric columns as float64 and text columns without missing values
+def prepare_frame(df):
+    df = normalize_company_data(df).drop_duplicates('Ticker', keep='last').set_index('Ticker')
+    df = df.reindex(columns=TEXT_COLUMNS + NUMERIC_COLUMNS)
+    for column in TEXT_COLUMNS:
+        df[column] = df[column].astype(object).where(df[column].notna(), '').astype(str)
+    return df
+
+# Function to compare two scrapes by ticker and return the compact change set (see CHANGE_COLUMNS). A numeric value
+# counts as changed when it moved by more than `threshold` relative to the previous value (0 = any change).
+def diff_frames(previous, current, threshold=0.0):
+    previous = prepare_frame(previous)
+    current = prepare_frame(current)
+    # Tickers of the new scrape in their order, then the ones it no longer has
+    dropped = current.index.get_indexer(previous.index) < 0
+    tickers = current.index.append(previous.index[dropped])
+    added = previous.index.get_indexer(tickers) < 0
+    removed = np.arange(len(tickers)) >= len(current)
+    old = previous.reindex(tickers)
+    new = current.reindex(tickers)
+    old[TEXT_COLUMNS] = old[TEXT_COLUMNS].fillna('')
+    new[TEXT_COLUMNS] = new[TEXT_COLUMNS].fillna('')
+
+    changed = {}
+    for column in NUMERIC_COLUMNS:
+        before = old[column].to_numpy(dtype='float64')
+        after = new[column].to_numpy(dtype='float64')
+        changed[column] = ~np.isclose(before, after, rtol=threshold, atol=0.0, equal_nan=True)
+    for column in TEXT_COLUMNS:
+        changed[column] = old[column].to_numpy() != new[column].to_numpy()
+    changed = pd.DataFrame(changed, index=tickers)
+    keep = (changed.any(axis=1) | added | removed).to_numpy()
+
+    old, new, changed = old[keep], new[keep], changed[keep]
+    added, removed = added[keep], removed[keep]
+    columns = changed.columns.to_numpy()
+    previous_price = old['Share Price'].to_numpy(dtype='float64')
+    price = new['Share Price'].to_numpy(dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_change = (price / previous_price - 1) * 100
+
+    return pd.DataFrame({
+        'Ticker': new.index,
+        # Removed tickers keep the name and groups they had
+        'Company Name': new['Company Name'].where(~removed, old['Company Name']).to_numpy(),
+        'Sector': new['Sector'].where(~removed, old['Sector']).to_numpy(),
+        'Industry': new['Industry'].where(~removed, old['Industry']).to_numpy(),
+        'Previous Sector': old['Sector'].to_numpy(),
+        'Previous Industry': old['Industry'].to_numpy(),
+        'Change': np.select([added, removed], ['added', 'removed'], default='changed'),
+        'Changed Columns': np.where(added | removed, '', [', '.join(columns[row]) for row in changed.to_numpy()]),
+        'Previous Share Price': previous_price,
+        'Share Price': price,
+        'Price Change %': np.round(price_change, 2),
+        'Previous Indicator': old['Indicator'].to_numpy(),
+        'Indicator': new['Indicator'].to_numpy(),
+        'Previous Indicator_2': old['Indicator_2'].to_numpy(),
+        'Indicator_2': new['Indicator_2'].to_numpy(),
+        'Crossed Above 50-DMA': ((new['Indicator_2'] == 'Above 50 day moving avg') & old['Indicator_2'].str.startswith('Below')).to_numpy(),
+        'Crossed Below 50-DMA': (new['Indicator_2'].str.startswith('Below') & (old['Indicator_2'] == 'Above 50 day moving avg')).to_numpy(),
+        'Near 52 Week High': ((new['Indicator'] == 'Close to 52 week High') & (old['Indicator'] != 'Close to 52 week High')).to_numpy(),
+        'Near 52 Week Low': ((new['Indicator'] == 'Close to 52 week low') & (old['Indicator'] != 'Close to 52 week low')).to_numpy(),
+    }, columns=CHANGE_COLUMNS)
+
+# Function to return the groups of a grouping key (e.g. 'Sector') touched by a change set; a ticker that moved to
+# another group touches both
+def changed_groups(changes, key):
+    groups = pd.concat([changes[key], changes[f'Previous {key}']])
+    return set(groups[groups.notna() & (groups != '')])
+
+# Function to return the latest stored snapshot date before the given date (today by default), or None
+def previous_snapshot_date(before=None, directory=y_fin_snapshots.SNAPSHOT_DIR):
+    before = y_fin_snapshots.to_date(before) or datetime.date.today()
+    dates = [snapshot_date for snapshot_date in y_fin_snapshots.list_snapshot_dates(directory) if snapshot_date < before]
+    return dates[-1] if dates else None
+
+# Function to compare a new scrape with the latest snapshot stored before its date; returns (previous date, change set),
+# or None when there is no earlier snapshot
+def diff_with_previous_snapshot(current, snapshot_date=None, directory=y_fin_snapshots.SNAPSHOT_DIR, threshold=0.0):
+    previous_date = previous_snapshot_date(snapshot_date, directory)
+    if previous_date is None:
+        return None
+    previous = y_fin_snapshots.read_snapshot(previous_date, ['Ticker'] + TEXT_COLUMNS + NUMERIC_COLUMNS, directory=directory)
+    return previous_date, diff_frames(previous, current, threshold)
+
+# Function to build the path of the change set of a snapshot date
+def changes_path(snapshot_date=None, directory=CHANGES_DIR):
+    snapshot_date = y_fin_snapshots.to_date(snapshot_date) or datetime.date.today()
+    return os.path.join(directory, f"changes_{snapshot_date:%Y-%m-%d}.csv")
+
+# Function to write a change set as CSV
+def write_changes(changes, snapshot_date=None, directory=CHANGES_DIR):
+    path = changes_path(snapshot_date, directory)
+    os.makedirs(directory, exist_ok=True)
+    changes.to_csv(path, index=False)
+    return path
+
+# Function to read a change set written by write_changes
+def read_changes(path):
+    return pd.read_csv(path, keep_default_na=False, na_values=[''], dtype={column: str for column in ['Ticker', 'Company Name', 'Sector', 'Industry', 'Previous Sector', 'Previous Industry', 'Previous Indicator', 'Indicator', 'Previous Indicator_2', 'Indicator_2']})
+
+# Function to print how many tickers changed and the indicator flips of a change set
+def print_summary(changes):
+    counts = changes['Change'].value_counts()
+    print(f"{len(changes)} tickers changed ({counts.get('added', 0)} added, {counts.get('removed', 0)} removed)")
+    for flag in ['Crossed Above 50-DMA', 'Crossed Below 50-DMA', 'Near 52 Week High', 'Near 52 Week Low']:
+        tickers = changes.loc[changes[flag], 'Ticker']
+        if len(tickers):
+            print(f"  {flag}: {', '.join(tickers)}")
+
+# Command line: diff two stored snapshots (by default the latest one against the one before it)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two snapshots by ticker and write the change set.")
+    parser.add_argument("--date", default=None, help="snapshot date to diff, YYYY-MM-DD (default: latest)")
+    parser.add_argument("--previous", default=None, help="snapshot date to diff against (default: the one before --date)")
+    parser.add_argument("--threshold", type=float, default=0.0, help="relative move below which a numeric value counts as unchanged")
+    parser.add_argument("--snapshot-dir", default=y_fin_snapshots.SNAPSHOT_DIR, help="Parquet snapshot store")
+    parser.add_argument("--changes-dir", default=CHANGES_DIR, help="directory the change set is written to")
+    args = parser.parse_args(argv)
+
+    dates = y_fin_snapshots.list_snapshot_dates(args.snapshot_dir)
+    current_date = y_fin_snapshots.to_date(args.date) or (dates[-1] if dates else None)
+    previous_date = y_fin_snapshots.to_date(args.previous) or previous_snapshot_date(current_date, args.snapshot_dir)
+    if current_date is None or previous_date is None:
+        parser.error("the snapshot store needs two snapshots to compare")
+
+    columns = ['Ticker'] + TEXT_COLUMNS + NUMERIC_COLUMNS
+    current = y_fin_snapshots.read_snapshot(current_date, columns, directory=args.snapshot_dir)
+    previous = y_fin_snapshots.read_snapshot(previous_date, columns, directory=args.snapshot_dir)
+    changes = diff_frames(previous, current, args.threshold)
+    print(f"Snapshot {current_date} against {previous_date}:")
+    print_summary(changes)
+    print(f"Change set saved to {write_changes(changes, current_date, args.changes_dir)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Field definitions shared by the Selenium and HTTP scraping backends
+
+# Base URL of the quote pages; overridden by the benchmarks to point at a local fixture server
+BASE_URL = "https://finance.yahoo.com"
+
+# XPaths of the fields read from the key-statistics tab
+STATISTICS_FIELDS = {
+    'Market Cap': '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[1]/div/div/div/div/table/tbody/tr[1]/td[2]',
+    'Share Price': '//*[@id="quote-header-info"]/div[3]/div[1]/div/fin-streamer[1]',
+    'Trailing P/E': '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[1]/div/div/div/div/table/tbody/tr[3]/td[2]',
+    'PB': '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[1]/div/div/div/div/table/tbody/tr[7]/td[2]',
+    'Beta': '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[2]/div/div[1]/div/div/table/tbody/tr[1]/td[2]',
+    '52 Week High': '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[2]/div/div[1]/div/div/table/tbody/tr[4]/td[2]',
+    '52 Week Low': '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[2]/div/div[1]/div/div/table/tbody/tr[5]/td[2]',
+    '50-Day Moving Average': '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[2]/div/div[1]/div/div/table/tbody/tr[6]/td[2]',
+    'Enterprise Value': '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[1]/div/div/div/div/table/tbody/tr[2]/td[2]',
+}
+
+# XPaths of the fields read from the profile tab
+PROFILE_FIELDS = {
+    'Sector': '//*[@id="Col1-0-Profile-Proxy"]/section/div[1]/div/div/p[2]/span[2]',
+    'No. of employees': '//*[@id="Col1-0-Profile-Proxy"]/section/div[1]/div/div/p[2]/span[6]',
+}
+
+# Fields of each quote page tab, in the order the tabs are scraped
+TAB_FIELDS = {
+    'key-statistics': STATISTICS_FIELDS,
+    'profile': PROFILE_FIELDS,
+}
+
+# Order of the values returned by the scrape functions
+SCRAPED_FIELDS = list(STATISTICS_FIELDS) + list(PROFILE_FIELDS)
+
+# Fields y_fin_indicators can compute from the stored price history, so they need not be scraped
+INDICATOR_FIELDS = ['52 Week High', '52 Week Low', '50-Day Moving Average']
+
+# Function to return the tab fields to scrape without the given fields; skipped fields come back as None
+def select_tab_fields(skip=()):
+    return {tab: {name: xpath for name, xpath in fields.items() if name not in skip} for tab, fields in TAB_FIELDS.items()}
+
+# Status of one scraped field
+FIELD_OK = "ok"  # value found
+FIELD_MISSING = "missing"  # the page loaded but the field was not on it
+FIELD_ERROR = "error"  # the tab could not be loaded
+FIELD_SKIPPED = "skipped"  # not requested
+
+# Values scraped for one symbol, with the status of every field; fields without a value are None
+class ScrapeResult:
+    def __init__(self):
+        self.values = {name: None for name in SCRAPED_FIELDS}
+        self.status = {name: FIELD_SKIPPED for name in SCRAPED_FIELDS}
+
+    # Function to record one extracted field; None means it was not on the page
+    def set(self, name, value):
+        self.values[name] = value
+        self.status[name] = FIELD_MISSING if value is None else FIELD_OK
+
+    # Function to record that the fields of a tab could not be scraped because the tab failed to load
+    def tab_failed(self, fields):
+        for name in fields:
+            self.values[name] = None
+            self.status[name] = FIELD_ERROR
+
+    # Function to take over the fields another scrape of the same symbol found
+    def merge(self, other):
+        for name, status in other.status.items():
+            if status == FIELD_OK:
+                self.set(name, other.values[name])
+
+    # Function to list the requested fields without a value
+    def failed_fields(self):
+        return [name for name, status in self.status.items() if status in (FIELD_MISSING, FIELD_ERROR)]
+
+    # Function to list the tabs holding at least one requested field without a value
+    def failed_tabs(self, tab_fields=TAB_FIELDS):
+        failed = set(self.failed_fields())
+        return [tab for tab, fields in tab_fields.items() if failed.intersection(fields)]
+
+    # Function to tell whether any field was found
+    def has_values(self):
+        return FIELD_OK in self.status.values()
+
+# Function to build the URL of one quote page tab for an NSE symbol
+def quote_url(symbol, tab, base_url=BASE_URL):
+    return f"{base_url}/quote/{symbol}.NS/{tab}"
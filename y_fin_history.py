@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+from urllib.parse import quote
+import numpy as np
+import pandas as pd
+
+# Root directory of the historical price store: one sub-directory of .npy arrays per ticker plus an index
+HISTORY_DIR = "history"
+
+# Index file listing the stored tickers and their company names; rewritten on every import
+INDEX_FILE = "index.json"
+
+# Price columns kept for every ticker, as in the Yahoo Finance history downloads
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+# Number of points per series precomputed for charts
+CHART_POINTS = 500
+
+# Function to return the row indices of a min/max downsampling of y: the series is cut into points // 2 buckets
+# and the lowest and highest value of each bucket are kept, so peaks and troughs survive at any history length
+def minmax_indices(y, points=CHART_POINTS):
+    n = len(y)
+    if n <= points:
+        return np.arange(n)
+    y = np.asarray(y, dtype='float64')
+    buckets = max(1, points // 2)
+    edges = np.linspace(0, n, buckets + 1).astype(int)[:-1]
+    bucket_of = np.repeat(np.arange(buckets), np.diff(np.append(edges, n)))
+    selected = []
+    for values, reduce in ((np.where(np.isnan(y), np.inf, y), np.minimum), (np.where(np.isnan(y), -np.inf, y), np.maximum)):
+        extremes = reduce.reduceat(values, edges)
+        candidates = np.flatnonzero(values == extremes[bucket_of])
+        # First row reaching the extreme in each bucket
+        selected.append(candidates[np.unique(bucket_of[candidates], return_index=True)[1]])
+    return np.unique(np.concatenate(selected))
+
+# Historical daily prices of many tickers stored as memory-mapped NumPy arrays
+class HistoryStore:
+    def __init__(self, directory=HISTORY_DIR):
+        self.directory = directory
+        self.index = {}
+        index_path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    # Function to return the stored tickers
+    def tickers(self):
+        return list(self.index)
+
+    # Function to return the company name of a ticker
+    def company_name(self, ticker):
+        return self.index[ticker]
+
+    # Function to return the directory holding the arrays of a ticker
+    def ticker_dir(self, ticker):
+        return os.path.join(self.directory, quote(ticker, safe=""))
+
+    # Function to store the full history of one ticker, replacing what was stored before.
+    # `df` has a Date column and the price columns.
+    def write(self, ticker, company_name, df):
+        df = df.dropna(subset=['Date']).sort_values('Date').drop_duplicates('Date', keep='last')
+        dates = pd.to_datetime(df['Date']).to_numpy().astype('datetime64[D]')
+        prices = df.reindex(columns=PRICE_COLUMNS).to_numpy(dtype='float64')
+        chart_index = np.full((len(PRICE_COLUMNS), min(len(df), CHART_POINTS)), -1, dtype='int32')
+        for position in range(len(PRICE_COLUMNS)):
+            selected = minmax_indices(prices[:, position])
+            chart_index[position, :len(selected)] = selected
+
+        target_dir = self.ticker_dir(ticker)
+        os.makedirs(target_dir, exist_ok=True)
+        np.save(os.path.join(target_dir, "dates.npy"), dates)
+        np.save(os.path.join(target_dir, "prices.npy"), prices)
+        np.save(os.path.join(target_dir, "chart_index.npy"), chart_index)
+
+        self.index[ticker] = company_name
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=1)
+        os.replace(index_path + ".tmp", index_path)
+
+    # Function to open the arrays of a ticker without reading them into memory
+    def arrays(self, ticker):
+        target_dir = self.ticker_dir(ticker)
+        dates = np.load(os.path.join(target_dir, "dates.npy"), mmap_mode='r')
+        prices = np.load(os.path.join(target_dir, "prices.npy"), mmap_mode='r')
+        return dates, prices
+
+    # Function to find the row range of a ticker's history between start and end (inclusive)
+    def date_range(self, dates, start=None, end=None):
+        first = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start).date(), 'D'), side='left')
+        last = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end).date(), 'D'), side='right')
+        return first, last
+
+    # Function to load the prices of a ticker between start and end (inclusive) as a frame like the history downloads
+    def load(self, ticker, start=None, end=None):
+        dates, prices = self.arrays(ticker)
+        first, last = self.date_range(dates, start, end)
+        df = pd.DataFrame(np.asarray(prices[first:last]), columns=PRICE_COLUMNS)
+        df.insert(0, 'Date', pd.to_datetime(np.asarray(dates[first:last])))
+        df.insert(0, 'Company Name', self.index[ticker])
+        return df
+
+    # Function to return at most `points` (date, value) pairs per column for charting; the full history uses the
+    # precomputed downsampling, other date ranges are downsampled on the fly. Returns {column: (dates, values)}.
+    def chart_series(self, ticker, columns=('Open', 'Close', 'High', 'Low'), start=None, end=None, points=CHART_POINTS):
+        dates, prices = self.arrays(ticker)
+        first, last = self.date_range(dates, start, end)
+        full_range = first == 0 and last == len(dates) and points == CHART_POINTS
+        if full_range:
+            chart_index = np.load(os.path.join(self.ticker_dir(ticker), "chart_index.npy"))
+        series = {}
+        for column in columns:
+            position = PRICE_COLUMNS.index(column)
+            if full_range:
+                selected = chart_index[position][chart_index[position] >= 0]
+            else:
+                selected = first + minmax_indices(np.asarray(prices[first:last, position]), points)
+            series[column] = (pd.to_datetime(np.asarray(dates[selected])), np.asarray(prices[selected, position]))
+        return series
+
+# Function to import a Yahoo Finance history workbook or CSV (e.g. 360ONE.NS.xlsx) into the store;
+# the ticker is taken from the file name unless given
+def import_history_file(path, ticker=None, store=None):
+    store = store or HistoryStore()
+    df = pd.read_csv(path) if path.endswith(".csv") else pd.read_excel(path)
+    ticker = ticker or os.path.basename(path).split(".")[0]
+    company_name = df['Company Name'].iloc[0] if 'Company Name' in df and len(df) else ticker
+    store.write(ticker, company_name, df)
+    return ticker
+
+# Command line: import history files into the store
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import daily price history files into the historical price store.")
+    parser.add_argument("paths", nargs="+", help="history workbooks or CSV files named <TICKER>.NS.xlsx/.csv")
+    parser.add_argument("--dir", default=HISTORY_DIR, help="historical price store directory")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.dir)
+    for path in args.paths:
+        print(f"Imported {import_history_file(path, store=store)} from {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import etree, html
+
+from y_fin_fields import BASE_URL, TAB_FIELDS, ScrapeResult, quote_url
+from y_fin_metrics import logger, metrics
+
+# Browser-like headers so the quote pages are served the same markup as in Chrome
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# XPaths compiled once per process instead of once per lookup
+COMPILED_FIELDS = {tab: {name: etree.XPath(xpath) for name, xpath in fields.items()} for tab, fields in TAB_FIELDS.items()}
+
+# Function to create a keep-alive HTTP session with a connection pool of the given size
+def create_session(pool_size=10):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(REQUEST_HEADERS)
+    return session
+
+# Function to extract the fields of one tab (or only the named ones) from its raw HTML; fields that are not on
+# the page come back as None
+def extract_fields(tab, page, names=None):
+    with metrics.timer("html_parse"):
+        tree = html.fromstring(page)
+    values = {}
+    for name, xpath in COMPILED_FIELDS[tab].items():
+        if names is not None and name not in names:
+            continue
+        start = time.perf_counter()
+        matches = xpath(tree)
+        values[name] = matches[0].text_content().strip() if matches else None
+        metrics.record("field_extract", time.perf_counter() - start)
+    return values
+
+# Function to download the raw HTML of one quote page tab; with a PageCache, fresh pages are served from disk
+# and stale ones are revalidated with a conditional request
+def fetch_page(session, symbol, tab, base_url=BASE_URL, timeout=10, cache=None):
+    cached = cache.lookup(symbol, tab) if cache else None
+    if cached and cached.fresh:
+        return cached.body
+
+    with metrics.timer("page_load"):
+        response = session.get(quote_url(symbol, tab, base_url), timeout=timeout, headers=cached.conditional_headers() if cached else None)
+    if cached and response.status_code == 304:
+        cache.refresh(symbol, tab)
+        return cached.body
+    response.raise_for_status()
+    if cache:
+        cache.store(symbol, tab, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return response.content
+
+# Function to scrape the same fields as y_fin_mini.scrape_company_data without a browser; a tab that fails to
+# download or parse only loses its own fields
+def scrape_company_data_http(session, symbol, base_url=BASE_URL, cache=None, tab_fields=TAB_FIELDS):
+    result = ScrapeResult()
+    for tab, fields in tab_fields.items():
+        try:
+            page = fetch_page(session, symbol, tab, base_url, cache=cache)
+        except Exception as e:
+            logger.warning("event=page_load_failed symbol=%s tab=%s error=%r", symbol, tab, e)
+            result.tab_failed(fields)
+            continue
+        try:
+            values = extract_fields(tab, page, fields)
+        except Exception as e:
+            # An empty or unparsable body (e.g. lxml's "Document is empty")
+            logger.warning("event=page_parse_failed symbol=%s tab=%s error=%r", symbol, tab, e)
+            if cache:
+                cache.discard(symbol, tab)
+            result.tab_failed(fields)
+            continue
+        for name, value in values.items():
+            result.set(name, value)
+    return result
@@ -0,0 +1,237 @@
+import argparse
+import datetime
+import math
+import os
+import pickle
+from collections import deque
+import pandas as pd
+
+from y_fin_normalize import parse_numbers
+from y_fin_snapshots import SNAPSHOT_DIR, list_snapshot_dates, read_snapshots
+
+# File the engine state is persisted to between runs
+INDICATOR_STATE_PATH = "indicator_state.pkl"
+
+# Window lengths, in daily bars
+YEAR_BARS = 252
+SMA_BARS = 50
+EMA_BARS = 20
+VOLATILITY_BARS = 20
+BETA_BARS = 60
+
+# Bars a ticker needs before its indicators are reported, so a short history does not flag every company
+MIN_PERIODS = 20
+
+# Columns of IndicatorEngine.values(); the first three replace the scraped fields of the same name
+INDICATOR_COLUMNS = ['52 Week High', '52 Week Low', '50-Day Moving Average', '20-Day EMA', '20-Day Volatility', '60-Day Beta']
+
+# Highest (or lowest) value of the last `window` bars, kept in a monotonic deque: every value is pushed and popped once
+class RollingExtreme:
+    def __init__(self, window, largest=True):
+        self.window = window
+        self.largest = largest
+        self.items = deque()  # (bar, value), values decreasing (increasing for the lowest)
+
+    def push(self, bar, value):
+        while self.items and (self.items[-1][1] <= value if self.largest else self.items[-1][1] >= value):
+            self.items.pop()
+        self.items.append((bar, value))
+        while self.items[0][0] <= bar - self.window:
+            self.items.popleft()
+
+    @property
+    def value(self):
+        return self.items[0][1] if self.items else math.nan
+
+# Running sums of the last `window` values of one or two series: mean, variance and covariance in O(1) per value
+class RollingMoments:
+    def __init__(self, window):
+        self.window = window
+        self.items = deque()
+        self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = 0.0
+
+    def push(self, x, y=0.0):
+        self.items.append((x, y))
+        self.sum_x += x
+        self.sum_y += y
+        self.sum_xx += x * x
+        self.sum_xy += x * y
+        if len(self.items) > self.window:
+            old_x, old_y = self.items.popleft()
+            self.sum_x -= old_x
+            self.sum_y -= old_y
+            self.sum_xx -= old_x * old_x
+            self.sum_xy -= old_x * old_y
+
+    @property
+    def count(self):
+        return len(self.items)
+
+    @property
+    def mean(self):
+        return self.sum_x / self.count if self.count else math.nan
+
+    @property
+    def variance(self):
+        n = self.count
+        return max(0.0, (self.sum_xx - self.sum_x * self.sum_x / n) / (n - 1)) if n > 1 else math.nan
+
+    @property
+    def covariance(self):
+        n = self.count
+        return (self.sum_xy - self.sum_x * self.sum_y / n) / (n - 1) if n > 1 else math.nan
+
+# Function to turn a date, timestamp or "YYYY-MM-DD" text into a datetime.date; None means today
+def to_day(value):
+    return datetime.date.today() if value is None else pd.Timestamp(value).date()
+
+# Rolling state of one ticker, updated with one closing price per bar
+class TickerState:
+    def __init__(self):
+        self.high = RollingExtreme(YEAR_BARS, largest=True)
+        self.low = RollingExtreme(YEAR_BARS, largest=False)
+        self.sma = RollingMoments(SMA_BARS)
+        self.returns = RollingMoments(VOLATILITY_BARS)
+        self.market = RollingMoments(BETA_BARS)  # market return as x, ticker return as y
+        self.ema = math.nan
+        self.last_price = math.nan
+        self.bars = 0
+
+    # Function to return the ticker's daily log return for a new price
+    def log_return(self, price):
+        return math.log(price / self.last_price) if self.last_price > 0 and price > 0 else math.nan
+
+    def push(self, bar, price, ticker_return, market_return):
+        self.high.push(bar, price)
+        self.low.push(bar, price)
+        self.sma.push(price)
+        alpha = 2 / (EMA_BARS + 1)
+        self.ema = price if math.isnan(self.ema) else alpha * price + (1 - alpha) * self.ema
+        if not math.isnan(ticker_return):
+            self.returns.push(ticker_return)
+            if not math.isnan(market_return):
+                self.market.push(market_return, ticker_return)
+        self.last_price = price
+        self.bars += 1
+
+    def values(self):
+        if self.bars < MIN_PERIODS:
+            return [math.nan] * len(INDICATOR_COLUMNS)
+        market_variance = self.market.variance
+        beta = self.market.covariance / market_variance if market_variance > 0 else math.nan
+        return [self.high.value, self.low.value, self.sma.mean, self.ema, math.sqrt(self.returns.variance * YEAR_BARS), beta]
+
+# Technical indicators of every ticker computed from daily closing prices. Each new bar updates the rolling state
+# of the tickers in O(1), so a daily run only feeds the day's prices instead of recomputing the whole history.
+# The 52 week high/low are those of the daily closes, since the store holds one price per day.
+class IndicatorEngine:
+    def __init__(self):
+        self.states = {}
+        self.bar = -1
+        self.last_date = None
+
+    # Function to feed the closing prices of one date ({ticker: price} or a Series indexed by ticker)
+    def update(self, snapshot_date, prices):
+        snapshot_date = to_day(snapshot_date)
+        if self.last_date is not None and snapshot_date <= self.last_date:
+            raise ValueError(f"Prices for {snapshot_date} are not newer than the last update ({self.last_date})")
+        self.bar += 1
+        self.last_date = snapshot_date
+
+        prices = {ticker: price for ticker, price in pd.Series(prices, dtype='float64').dropna().items() if price > 0}
+        states = {ticker: self.states.get(ticker) or TickerState() for ticker in prices}
+        returns = {ticker: states[ticker].log_return(price) for ticker, price in prices.items()}
+        # The market return is the equal-weighted mean return of the universe, as no index series is stored
+        known_returns = [value for value in returns.values() if not math.isnan(value)]
+        market_return = sum(known_returns) / len(known_returns) if known_returns else math.nan
+        for ticker, price in prices.items():
+            states[ticker].push(self.bar, price, returns[ticker], market_return)
+        self.states.update(states)
+
+    # Function to return the current indicators of every ticker, one row per ticker
+    def values(self):
+        return pd.DataFrame([state.values() for state in self.states.values()], index=pd.Index(list(self.states), name='Ticker'), columns=INDICATOR_COLUMNS)
+
+    def save(self, path=INDICATOR_STATE_PATH):
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def load(path=INDICATOR_STATE_PATH):
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+# Function to feed the engine the stored snapshots dated after its last update and before `before` (all if None)
+def replay_snapshots(engine, before=None, directory=SNAPSHOT_DIR):
+    start = None if engine.last_date is None else engine.last_date + datetime.timedelta(days=1)
+    end = None if before is None else to_day(before) - datetime.timedelta(days=1)
+    prices = read_snapshots(['Ticker', 'Share Price'], start=start, end=end, directory=directory)
+    if len(prices):
+        wide = prices.pivot_table(index='date', columns='Ticker', values='Share Price', aggfunc='last', observed=True).sort_index()
+        for snapshot_date, row in wide.iterrows():
+            engine.update(snapshot_date, row)
+    return engine
+
+# Function to build the engine from the stored snapshots, replaying every date before `before` (all dates if None)
+def build_engine(before=None, directory=SNAPSHOT_DIR):
+    return replay_snapshots(IndicatorEngine(), before, directory)
+
+# Function to return the persisted engine, ready to be fed the prices of `snapshot_date`. The engine is rebuilt from
+# the store when there is no state yet, or when the state already holds that date (e.g. a second run on one day);
+# snapshots stored since the state was saved (e.g. by runs with scraped indicators) are replayed first.
+def engine_for_date(snapshot_date, path=INDICATOR_STATE_PATH, directory=SNAPSHOT_DIR):
+    snapshot_date = to_day(snapshot_date)
+    engine = IndicatorEngine.load(path)
+    if engine is None or (engine.last_date is not None and engine.last_date >= snapshot_date):
+        print(f"Building indicator state from the snapshot store ({directory})...")
+        return build_engine(snapshot_date, directory)
+    return replay_snapshots(engine, snapshot_date, directory)
+
+# Function to tell whether the store holds enough snapshots before `snapshot_date` for the engine to report
+# indicators once that date's prices are fed
+def has_enough_history(snapshot_date=None, directory=SNAPSHOT_DIR):
+    snapshot_date = to_day(snapshot_date)
+    return sum(stored_date < snapshot_date for stored_date in list_snapshot_dates(directory)) >= MIN_PERIODS - 1
+
+# Function to fill the 52 week high/low and 50 day moving average of scraped rows from the engine, after feeding
+# it the rows' share prices for `snapshot_date`; the updated state is saved for the next run. Tickers with fewer
+# than MIN_PERIODS bars keep the values scraped for them, if any.
+def fill_local_indicators(df, snapshot_date=None, path=INDICATOR_STATE_PATH, directory=SNAPSHOT_DIR):
+    snapshot_date = to_day(snapshot_date)
+    engine = engine_for_date(snapshot_date, path, directory)
+    prices = parse_numbers(df['Share Price']).set_axis(df['Ticker'])
+    engine.update(snapshot_date, prices[~prices.index.duplicated()])
+    engine.save(path)
+    values = engine.values()
+    df = df.copy()
+    for column in ['52 Week High', '52 Week Low', '50-Day Moving Average']:
+        df[column] = df['Ticker'].map(values[column]).astype('float64').fillna(parse_numbers(df[column])).to_numpy(dtype='float64')
+    return df
+
+# Command line: rebuild the persisted state from the snapshot store, or write the current indicators
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute technical indicators from the stored daily prices.")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot store directory")
+    parser.add_argument("--state", default=INDICATOR_STATE_PATH, help="persisted indicator state file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="rebuild the indicator state from every stored snapshot")
+    show_parser = subparsers.add_parser("show", help="write the current indicators of every ticker")
+    show_parser.add_argument("--output", default="indicators.csv", help="CSV file to write")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        engine = build_engine(directory=args.dir)
+        engine.save(args.state)
+        print(f"Indicator state for {len(engine.states)} tickers through {engine.last_date} saved to {args.state}")
+    else:
+        engine = IndicatorEngine.load(args.state) or build_engine(directory=args.dir)
+        engine.values().to_csv(args.output)
+        print(f"Indicators for {len(engine.states)} tickers through {engine.last_date} saved to {args.output}")
+
+if __name__ == "__main__":
+    # Run through the imported module so the pickled state refers to y_fin_indicators classes, not __main__ ones
+    import y_fin_indicators
+    y_fin_indicators.main()
@@ -0,0 +1,98 @@
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+
+from y_fin_fields import FIELD_ERROR, FIELD_MISSING
+
+# Logger shared by the scraper modules; configure_logging() decides what reaches the console
+logger = logging.getLogger("y_fin")
+
+# Directory the per-run metrics summaries are written to
+METRICS_DIR = "metrics"
+
+# Percentiles reported for every stage
+PERCENTILES = [50, 95, 99]
+
+# Function to send the scraper logs to the console as leveled, timestamped key=value lines
+def configure_logging(level="INFO"):
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s level=%(levelname)s %(message)s"))
+    logger.handlers[:] = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
+
+# Timings, counters and per-field failures of one scrape run; shared by all scraper threads and coroutines
+class RunMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    # Function to forget everything recorded so far and start a new run
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.durations = {}
+            self.counters = {}
+            self.field_status = {}
+
+    # Function to record one duration of a stage, in seconds
+    def record(self, stage, seconds):
+        with self.lock:
+            self.durations.setdefault(stage, []).append(seconds)
+
+    # Context manager timing the block it wraps as one occurrence of a stage
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    # Function to add to a named counter
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    # Function to count the fields of a ScrapeResult that did not come back with a value, per field and status
+    def record_fields(self, result):
+        with self.lock:
+            for name, status in result.status.items():
+                if status in (FIELD_MISSING, FIELD_ERROR):
+                    by_status = self.field_status.setdefault(name, {})
+                    by_status[status] = by_status.get(status, 0) + 1
+
+    # Function to summarize the run: count, total, mean and percentiles of every stage in milliseconds,
+    # the counters and the failures per field
+    def summary(self):
+        with self.lock:
+            stages = {}
+            for stage, durations in self.durations.items():
+                milliseconds = np.asarray(durations) * 1000
+                stages[stage] = {'count': len(milliseconds), 'total_ms': round(float(milliseconds.sum()), 3), 'mean_ms': round(float(milliseconds.mean()), 3)}
+                for percentile, value in zip(PERCENTILES, np.percentile(milliseconds, PERCENTILES)):
+                    stages[stage][f'p{percentile}_ms'] = round(float(value), 3)
+                stages[stage]['max_ms'] = round(float(milliseconds.max()), 3)
+            return {
+                'started': datetime.datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+                'duration_s': round(time.time() - self.started, 3),
+                'stages': stages,
+                'counters': dict(self.counters),
+                'field_failures': {name: dict(by_status) for name, by_status in self.field_status.items()},
+            }
+
+    # Function to write the summary of the run as JSON; the file name carries the run's start time
+    def write(self, directory=METRICS_DIR):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"metrics_{datetime.datetime.fromtimestamp(self.started):%Y-%m-%dT%H%M%S}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=1)
+        return path
+
+# Metrics of the current run, recorded into by every scraper module
+metrics = RunMetrics()
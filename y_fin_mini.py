@@ -1,12 +1,30 @@
+import argparse
+import datetime
+import queue
+import threading
+import time
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
+import y_fin_checkpoint
+import y_fin_diff
+import y_fin_normalize
+import y_fin_snapshots
+from y_fin_metrics import METRICS_DIR, configure_logging, logger, metrics
+from y_fin_fields import BASE_URL, INDICATOR_FIELDS, TAB_FIELDS, ScrapeResult, quote_url, select_tab_fields
 
-# Function to initialize the WebDriver
+# Columns of one scraped row, as written to the checkpoint
+SCRAPED_COLUMNS = ['Company Name', 'Industry', 'Sector', 'Ticker', 'Share Price', 'Market Cap', 'Enterprise Value', 'Trailing P/E', 'PB', 'Beta', '52 Week High', '52 Week Low', '50-Day Moving Average', 'No. of employees']
+
+# Raised when none of the scrapers of a pool could be started, e.g. Chrome or chromedriver is missing, or when no worker
+# of a queue run is left to take the pending symbols
+class ScraperUnavailableError(Exception):
+    pass
+
+# Function to initialize the WebDriver; Selenium is only imported here, so the HTTP backends start without it
 def initialize_driver():
-    print("Initializing WebDriver...")
+    logger.info("event=driver_init")
     try:
+        from selenium import webdriver
+
         # Set Chrome options
         chrome_options = webdriver.ChromeOptions()
         chrome_options.add_argument("--headless")  # Run Chrome in headless mode
@@ -15,131 +33,460 @@ def initialize_driver():
         chrome_options.add_experimental_option('useAutomationExtension', False)
         
         # Create a new Chrome window
-        driver = webdriver.Chrome(options=chrome_options)
-        print("WebDriver initialized successfully.")
+        with metrics.timer("driver_init"):
+            driver = webdriver.Chrome(options=chrome_options)
+        logger.info("event=driver_ready")
         return driver
     except Exception as e:
-        print(f"Error initializing WebDriver: {e}")
+        logger.error("event=driver_init_failed error=%r", e)
         return None
 
 # Function to scrape market cap, share price, trailing P/E, Price/Book (mrq), beta, 52 Week High, 52 Week Low, 50-Day Moving Average, Enterprise Value, sector, and full-time employees from the statistics and profile tabs for a given company symbol
-def scrape_company_data(driver, symbol):
+# (only the fields in tab_fields are looked up). Every field is extracted on its own, so a missing element or a tab
+# that fails to load only loses those fields; returns a ScrapeResult
+def scrape_company_data(driver, symbol, base_url=BASE_URL, tab_fields=TAB_FIELDS):
+    from selenium.common.exceptions import NoSuchElementException
+    from selenium.webdriver.common.by import By
+
+    result = ScrapeResult()
+    for tab, fields in tab_fields.items():
+        logger.debug("event=page_load symbol=%s tab=%s", symbol, tab)
+        try:
+            with metrics.timer("page_load"):
+                driver.get(quote_url(symbol, tab, base_url))
+        except Exception as e:
+            logger.warning("event=page_load_failed symbol=%s tab=%s error=%r", symbol, tab, e)
+            result.tab_failed(fields)
+            continue
+        for name, xpath in fields.items():
+            start = time.perf_counter()
+            try:
+                value = driver.find_element(By.XPATH, xpath).text
+            except NoSuchElementException:
+                value = None
+            except Exception as e:
+                logger.warning("event=field_failed symbol=%s field=%r error=%r", symbol, name, e)
+                value = None
+            metrics.record("field_extract", time.perf_counter() - start)
+            logger.debug("event=field symbol=%s field=%r value=%r", symbol, name, value)
+            result.set(name, value)
+    return result
+
+# Scraper backed by one headless Chrome
+class SeleniumScraper:
+    def __init__(self, base_url=BASE_URL, tab_fields=TAB_FIELDS):
+        self.base_url = base_url
+        self.tab_fields = tab_fields
+        self.driver = initialize_driver()
+        self.available = self.driver is not None
+
+    def scrape(self, symbol):
+        return scrape_company_data(self.driver, symbol, self.base_url, self.tab_fields)
+
+    def close(self):
+        if self.driver:
+            self.driver.quit()
+            logger.info("event=driver_closed")
+
+# Scraper that downloads the raw pages over a keep-alive HTTP session, falling back to Selenium for symbols it cannot parse
+class HttpScraper:
+    def __init__(self, base_url=BASE_URL, fallback=True, cache=None, tab_fields=TAB_FIELDS):
+        import y_fin_http
+        self.http = y_fin_http
+        self.base_url = base_url
+        self.tab_fields = tab_fields
+        self.cache = cache
+        self.session = y_fin_http.create_session()
+        self.fallback = fallback
+        self.fallback_scraper = None
+        self.available = True
+
+    # Only the tabs with missing fields are loaded again through Selenium
+    def scrape(self, symbol):
+        result = self.http.scrape_company_data_http(self.session, symbol, self.base_url, self.cache, self.tab_fields)
+        failed_tabs = result.failed_tabs(self.tab_fields)
+        if self.fallback and failed_tabs:
+            logger.info("event=fallback symbol=%s tabs=%s", symbol, ",".join(failed_tabs))
+            metrics.count("selenium_fallbacks")
+            if self.fallback_scraper is None:
+                self.fallback_scraper = SeleniumScraper(self.base_url)
+            if self.fallback_scraper.available:
+                result.merge(scrape_company_data(self.fallback_scraper.driver, symbol, self.base_url, {tab: self.tab_fields[tab] for tab in failed_tabs}))
+        return result
+
+    def close(self):
+        self.session.close()
+        if self.fallback_scraper:
+            self.fallback_scraper.close()
+
+# Function to create the scraper for the requested backend
+def create_scraper(backend, base_url=BASE_URL, fallback=True, cache=None, tab_fields=TAB_FIELDS):
+    if backend == "http":
+        return HttpScraper(base_url, fallback, cache, tab_fields)
+    return SeleniumScraper(base_url, tab_fields)
+
+# Function to build one results row from a symbol list row and its ScrapeResult, or None if no field was found.
+# Fields without a value are kept as None (null in the checkpoint, NaN once normalized).
+def build_result_row(row, result):
+    metrics.record_fields(result)
+    if not result.has_values():
+        metrics.count("symbols_failed")
+        logger.warning("event=symbol_failed symbol=%s", row['Symbol'])
+        return None
+    if result.failed_fields():
+        metrics.count("symbols_partial")
+        logger.info("event=fields_missing symbol=%s fields=%s", row['Symbol'], ",".join(result.failed_fields()))
+    with metrics.timer("row_build"):
+        values = result.values
+        return [row['Company Name'], row['Industry'], values['Sector'], row['Symbol']] + [values[column] for column in SCRAPED_COLUMNS[4:]]
+
+# Worker loop: owns one scraper for its whole lifetime and scrapes symbols taken from the shared work queue.
+# A worker whose scraper did not start stops at once and leaves the symbols to the other workers.
+def scrape_worker(worker_id, work_queue, worker_rows, started, base_url, backend, fallback, cache, checkpoint, tab_fields=TAB_FIELDS):
+    scraper = create_scraper(backend, base_url, fallback, cache, tab_fields)
     try:
-        symbol_with_extension = symbol + ".NS"
-        
-        # Scraping market cap, share price, trailing P/E, Price/Book (mrq), beta, 52 Week High, 52 Week Low, 50-Day Moving Average, and Enterprise Value from statistics tab
-        print(f"Scraping data for symbol {symbol}...")
-        statistics_url = f"https://finance.yahoo.com/quote/{symbol_with_extension}/key-statistics"
-        driver.get(statistics_url)
-        market_cap = driver.find_element(By.XPATH, '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[1]/div/div/div/div/table/tbody/tr[1]/td[2]').text
-        print("Market Cap:", market_cap)
-        share_price = driver.find_element(By.XPATH, '//*[@id="quote-header-info"]/div[3]/div[1]/div/fin-streamer[1]').text
-        print("Share Price:", share_price)
-        trailing_pe = driver.find_element(By.XPATH, '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[1]/div/div/div/div/table/tbody/tr[3]/td[2]').text
-        print("Trailing P/E Ratio:", trailing_pe)
-        price_to_book = driver.find_element(By.XPATH, '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[1]/div/div/div/div/table/tbody/tr[7]/td[2]').text
-        print("Price/Book (mrq):", price_to_book)
-        beta = driver.find_element(By.XPATH, '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[2]/div/div[1]/div/div/table/tbody/tr[1]/td[2]').text
-        print("Beta:", beta)
-        fifty_two_week_high = driver.find_element(By.XPATH, '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[2]/div/div[1]/div/div/table/tbody/tr[4]/td[2]').text
-        print("52 Week High:", fifty_two_week_high)
-        fifty_two_week_low = driver.find_element(By.XPATH, '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[2]/div/div[1]/div/div/table/tbody/tr[5]/td[2]').text
-        print("52 Week Low:", fifty_two_week_low)
-        fifty_day_moving_avg = driver.find_element(By.XPATH, '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[2]/div/div[1]/div/div/table/tbody/tr[6]/td[2]').text
-        print("50-Day Moving Average:", fifty_day_moving_avg)
-        enterprise_value = driver.find_element(By.XPATH, '//*[@id="Col1-0-KeyStatistics-Proxy"]/section/div[2]/div[1]/div/div/div/div/table/tbody/tr[2]/td[2]').text
-        print("Enterprise Value:", enterprise_value)
-
-        # Scraping sector from profile tab
-        print(f"Scraping sector for symbol {symbol}...")
-        profile_url = f"https://finance.yahoo.com/quote/{symbol_with_extension}/profile"
-        driver.get(profile_url)
-        sector = driver.find_element(By.XPATH, '//*[@id="Col1-0-Profile-Proxy"]/section/div[1]/div/div/p[2]/span[2]').text
-        print("Sector:", sector)
-
-        # Scraping full-time employees from profile page
-        print(f"Scraping full-time employees for symbol {symbol}...")
-        full_time_employees = driver.find_element(By.XPATH, '//*[@id="Col1-0-Profile-Proxy"]/section/div[1]/div/div/p[2]/span[6]').text
-        print("Full Time Employees:", full_time_employees)
-
-        return market_cap, share_price, trailing_pe, price_to_book, beta, fifty_two_week_high, fifty_two_week_low, fifty_day_moving_avg, enterprise_value, sector, full_time_employees
-    except NoSuchElementException as e:
-        print(f"Error: {e}")
-        return None, None, None, None, None, None, None, None, None, None, None
-    except Exception as e:
-        print(f"Error scraping data for symbol {symbol}: {e}")
-        return None, None, None, None, None, None, None, None, None, None, None
+        if not scraper.available:
+            logger.error("event=worker_unavailable worker=%d", worker_id)
+            return
+        started.append(worker_id)
+        while True:
+            item = work_queue.get()
+            if item is None:
+                break
+            index, row = item
+            logger.debug("event=symbol_start worker=%d symbol=%s", worker_id, row['Symbol'])
+            # A symbol that raises is lost on its own instead of ending the worker
+            try:
+                with metrics.timer("symbol"):
+                    result_row = build_result_row(row, scraper.scrape(row['Symbol']))
+            except Exception as e:
+                metrics.count("symbols_failed")
+                logger.warning("event=symbol_failed worker=%d symbol=%s error=%r", worker_id, row['Symbol'], e)
+                continue
+            if result_row is not None:
+                metrics.count("symbols_scraped")
+                worker_rows.append((index, result_row))
+                if checkpoint:
+                    with metrics.timer("checkpoint_write"):
+                        checkpoint.write_row(result_row)
+    finally:
+        scraper.close()
+
+# Function to put an item on the work queue, waiting while it is full; returns False once no worker is left to take it
+def put_work(work_queue, item, workers):
+    while True:
+        try:
+            work_queue.put(item, timeout=1)
+            return True
+        except queue.Full:
+            if not any(worker.is_alive() for worker in workers):
+                return False
+
+# Function to scrape every symbol in the DataFrame with a pool of num_workers scrapers fed from a bounded work queue
+# Rows are streamed to the checkpoint writer, if given, as soon as they are scraped
+def scrape_with_pool(df, num_workers=1, base_url=BASE_URL, queue_size=None, backend="selenium", fallback=True, cache=None, checkpoint=None, tab_fields=TAB_FIELDS):
+    num_workers = max(1, num_workers)
+    work_queue = queue.Queue(maxsize=queue_size or num_workers * 2)
+    rows_per_worker = [[] for _ in range(num_workers)]
+    started = []
+
+    workers = [threading.Thread(target=scrape_worker, args=(worker_id, work_queue, rows_per_worker[worker_id], started, base_url, backend, fallback, cache, checkpoint, tab_fields), daemon=True) for worker_id in range(num_workers)]
+    for worker in workers:
+        worker.start()
+
+    # Feed the queue; put() blocks while the workers are busy, so at most queue_size rows are pending
+    for index, row in df.iterrows():
+        if not put_work(work_queue, (index, row), workers):
+            break
+    for _ in workers:
+        put_work(work_queue, None, workers)
+    for worker in workers:
+        worker.join()
+    if not started:
+        raise ScraperUnavailableError(f"none of the {num_workers} {backend} scrapers could be started")
+
+    # Merge the per-worker rows once, in the order of the input list
+    merged_rows = sorted((item for worker_rows in rows_per_worker for item in worker_rows), key=lambda item: item[0])
+    return y_fin_normalize.add_indicators(pd.DataFrame([result_row for _, result_row in merged_rows], columns=SCRAPED_COLUMNS))
+
+# Function to scrape every symbol with the asyncio pipeline; symbols that still fail after the dead-letter retries are reported
+def scrape_with_asyncio(df, concurrency=20, base_url=BASE_URL, rate=5.0, retries=3, cache=None, checkpoint=None, tab_fields=TAB_FIELDS):
+    import y_fin_async
+    rows_by_symbol = {row['Symbol']: row for _, row in df.iterrows()}
+    result_rows = {}
+
+    # Build and checkpoint each row as soon as its symbol completes
+    def on_result(symbol, result):
+        result_row = build_result_row(rows_by_symbol[symbol], result)
+        if result_row is not None:
+            metrics.count("symbols_scraped")
+            result_rows[symbol] = result_row
+            if checkpoint:
+                with metrics.timer("checkpoint_write"):
+                    checkpoint.write_row(result_row)
+
+    _, failed_symbols = y_fin_async.run_async_scrape(list(rows_by_symbol), base_url, concurrency=concurrency, rate=rate, retries=retries, cache=cache, on_result=on_result, tab_fields=tab_fields)
+    if failed_symbols:
+        metrics.count("symbols_failed", len(failed_symbols))
+        logger.warning("event=symbols_dead_lettered count=%d symbols=%s", len(failed_symbols), ",".join(failed_symbols))
+
+    return y_fin_normalize.add_indicators(pd.DataFrame([result_rows[symbol] for symbol in rows_by_symbol if symbol in result_rows], columns=SCRAPED_COLUMNS))
+
+# Function to scrape the symbols of the DataFrame with the backend chosen on the command line
+def scrape_pass(df, args, cache, checkpoint, tab_fields=TAB_FIELDS):
+    if args.backend == "async":
+        scrape_with_asyncio(df, args.workers, args.base_url, rate=args.rate, retries=args.retries, cache=cache, checkpoint=checkpoint, tab_fields=tab_fields)
+    else:
+        scrape_with_pool(df, args.workers, args.base_url, backend=args.backend, fallback=args.fallback, cache=cache, checkpoint=checkpoint, tab_fields=tab_fields)
 
-# Function to calculate the value for "indicator" field based on the given formula
-def calculate_indicator(share_price, fifty_two_week_high, fifty_two_week_low):
+# Worker loop of a sharded run: leases batches of symbols from the shared work queue, renews the lease before every
+# symbol and writes each result back, until no symbol is pending or leased on any node
+def queue_worker(worker_id, work_queue, args, cache, tab_fields=TAB_FIELDS):
+    import y_fin_workqueue
+    name = y_fin_workqueue.worker_name(worker_id)
+    scraper = create_scraper(args.backend, args.base_url, args.fallback, cache, tab_fields)
     try:
-        share_price_value = float(share_price.replace(',', ''))
-        fifty_two_week_high_value = float(fifty_two_week_high.replace(',', ''))
-        fifty_two_week_low_value = float(fifty_two_week_low.replace(',', ''))
-        
-        if share_price_value > (fifty_two_week_high_value - fifty_two_week_high_value * 0.05):
-            return "Close to 52 week High"
-        elif share_price_value < (fifty_two_week_low_value + fifty_two_week_low_value * 0.05):
-            return "Close to 52 week low"
-        else:
-            return ""
-    except Exception as e:
-        print(f"Error calculating 'indicator' value: {e}")
-        return ""
+        if not scraper.available:
+            logger.error("event=worker_unavailable worker=%s", name)
+            return
+        while True:
+            lease = work_queue.lease(name, args.batch_size)
+            if lease is None:
+                progress = work_queue.progress()
+                if sum(progress.values()) and not progress[y_fin_workqueue.PENDING] and not progress[y_fin_workqueue.LEASED]:
+                    break
+                # Nothing to lease yet: the coordinator has not loaded the queue, or other workers hold the
+                # remaining symbols and their leases come back here if those workers die
+                time.sleep(args.poll_interval)
+                continue
+            metrics.count("leases")
+            unstarted = [row['Symbol'] for row in lease.rows]
+            try:
+                for row in lease.rows:
+                    # A heartbeat that cannot reach the queue file (e.g. "database is locked") is taken as a lost lease
+                    try:
+                        renewed = work_queue.heartbeat(lease)
+                    except Exception as e:
+                        logger.warning("event=heartbeat_failed worker=%s error=%r", name, e)
+                        renewed = False
+                    if not renewed:
+                        logger.warning("event=lease_expired worker=%s", name)
+                        metrics.count("leases_expired")
+                        break
+                    unstarted.remove(row['Symbol'])
+                    logger.debug("event=symbol_start worker=%s symbol=%s", name, row['Symbol'])
+                    # A symbol that raises is failed on its own, using up one of its attempts, instead of ending the worker
+                    try:
+                        with metrics.timer("symbol"):
+                            result_row = build_result_row(row, scraper.scrape(row['Symbol']))
+                    except Exception as e:
+                        metrics.count("symbols_failed")
+                        logger.warning("event=symbol_failed worker=%s symbol=%s error=%r", name, row['Symbol'], e)
+                        result_row = None
+                    if result_row is None:
+                        work_queue.fail(lease, row['Symbol'])
+                    else:
+                        metrics.count("symbols_scraped")
+                        work_queue.complete(lease, row['Symbol'], result_row)
+            finally:
+                # Symbols left unscraped (e.g. on Ctrl+C) go back to the queue at once instead of waiting for the lease to expire
+                work_queue.release(lease, unstarted)
+    finally:
+        scraper.close()
 
-# Function to calculate the value for "indicator_2" field based on the given formula
-def calculate_indicator_2(share_price, fifty_day_moving_avg):
+# Function to take part in a sharded run over the shared work queue. The coordinator loads the symbol list into the
+# queue, scrapes with its own --workers threads and, once every symbol is done or failed on any node, returns the
+# results frame; a worker node only scrapes and returns None.
+def scrape_queue(df, args, cache, tab_fields=TAB_FIELDS):
+    import y_fin_workqueue
+    work_queue = y_fin_workqueue.WorkQueue(args.queue, args.lease_seconds)
     try:
-        share_price_value = float(share_price.replace(',', ''))
-        fifty_day_moving_avg_value = float(fifty_day_moving_avg.replace(',', ''))
-        
-        if share_price_value > fifty_day_moving_avg_value:
-            return "Above 50 day moving avg"
-        else:
-            return "Below 50 day moving avg."
-    except Exception as e:
-        print(f"Error calculating 'indicator_2' value: {e}")
-        return ""
+        if args.role == "coordinator":
+            run_date = y_fin_snapshots.to_date(args.snapshot_date) or datetime.date.today()
+            added = work_queue.load(df, run_date, reset=args.reset_queue)
+            logger.info("event=queue_loaded path=%s run_date=%s added=%d %s", args.queue, run_date, added, " ".join(f"{state}={count}" for state, count in work_queue.progress().items()))
+
+        workers = [threading.Thread(target=queue_worker, args=(worker_id, work_queue, args, cache, tab_fields), daemon=True) for worker_id in range(args.workers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if args.role != "coordinator":
+            return None
+
+        # The coordinator's own workers may all be gone (or never started), so it reclaims the leases of workers that
+        # died itself; the run is given up once no symbol was leased on any node for lease_seconds
+        idle_since = time.monotonic()
+        while not work_queue.finished():
+            work_queue.reclaim_expired()
+            progress = work_queue.progress()
+            if progress[y_fin_workqueue.LEASED]:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since > args.lease_seconds:
+                raise ScraperUnavailableError(f"no worker leased any of the {progress[y_fin_workqueue.PENDING]} pending symbols for {args.lease_seconds:g} seconds")
+            logger.info("event=queue_progress %s", " ".join(f"{state}={count}" for state, count in progress.items()))
+            time.sleep(args.poll_interval)
+        for worker, count in sorted(work_queue.worker_counts().items()):
+            logger.info("event=worker_done worker=%s symbols=%d", worker, count)
+        failed_symbols = work_queue.failed_symbols()
+        if failed_symbols:
+            logger.warning("event=symbols_failed count=%d symbols=%s", len(failed_symbols), ",".join(failed_symbols))
+        return work_queue.results_frame(SCRAPED_COLUMNS)
+    finally:
+        work_queue.close()
+
+# Function to load again only the tabs holding missing fields of the symbols in the checkpoint; the new rows are
+# merged with the earlier ones when the checkpoint is loaded. Symbols are grouped by the set of tabs they need.
+def refetch_missing(df, args, checkpoint_file, checkpoint, tab_fields=TAB_FIELDS):
+    requested = [name for fields in tab_fields.values() for name in fields]
+    groups = {}
+    for ticker, fields in y_fin_checkpoint.incomplete_symbols(checkpoint_file, SCRAPED_COLUMNS, requested).items():
+        tabs = tuple(tab for tab, tab_field_names in tab_fields.items() if set(fields).intersection(tab_field_names))
+        groups.setdefault(tabs, []).append(ticker)
+    for tabs, tickers in groups.items():
+        logger.info("event=refetch tabs=%s symbols=%d", ",".join(tabs), len(tickers))
+        metrics.count("symbols_refetched", len(tickers))
+        # The page cache is bypassed, as it would serve the same incomplete pages again
+        scrape_pass(df[df['Symbol'].isin(tickers)], args, None, checkpoint, {tab: tab_fields[tab] for tab in tabs})
+
+# Function to scrape the symbol list in this process, appending rows to the checkpoint of the snapshot date (today by
+# default) as they are scraped; --resume skips the symbols it already holds. Returns the checkpoint file.
+def scrape_with_checkpoint(df, args, cache, tab_fields=TAB_FIELDS):
+    checkpoint_file = y_fin_checkpoint.checkpoint_path(y_fin_snapshots.to_date(args.snapshot_date), directory=args.checkpoint_dir)
+    if args.resume:
+        done = y_fin_checkpoint.completed_symbols(checkpoint_file, SCRAPED_COLUMNS)
+        logger.info("event=resume checkpoint=%s symbols_done=%d", checkpoint_file, len(done))
+    else:
+        done = set()
+    pending_df = df[~df['Symbol'].isin(done)]
+    checkpoint = y_fin_checkpoint.CheckpointWriter(checkpoint_file, SCRAPED_COLUMNS, truncate=not args.resume)
+
+    # Scrape every pending symbol with the asyncio pipeline or a pool of scrapers
+    try:
+        with metrics.timer("scrape_pass"):
+            scrape_pass(pending_df, args, cache, checkpoint, tab_fields)
+        if args.refetch_missing:
+            with metrics.timer("refetch_pass"):
+                refetch_missing(df, args, checkpoint_file, checkpoint, tab_fields)
+    finally:
+        checkpoint.close()
+    return checkpoint_file
+
+# Function to parse the command line options
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape key statistics and profile data for the Nifty 500 list.")
+    parser.add_argument("--input", default="ind_nifty500list_usecase3.csv", help="CSV file with the symbol list")
+    parser.add_argument("--output", default="company_data_29_Mar.csv", help="CSV file to write the results to")
+    parser.add_argument("--base-url", default=BASE_URL, help="base URL of the quote pages")
+    parser.add_argument("--workers", type=int, default=1, help="number of scrapers running in parallel (concurrent symbols with --backend async)")
+    parser.add_argument("--backend", choices=["selenium", "http", "async"], default="selenium", help="fetch pages with headless Chrome, plain HTTP requests or the asyncio pipeline")
+    parser.add_argument("--rate", type=float, default=5.0, help="with --backend async, maximum requests per second per host")
+    parser.add_argument("--retries", type=int, default=3, help="with --backend async, retries per page before a symbol is dead-lettered")
+    parser.add_argument("--no-fallback", dest="fallback", action="store_false", help="with --backend http, do not retry unparsable symbols through Selenium")
+    parser.add_argument("--cache", default="page_cache.sqlite3", help="with --backend http or async, on-disk page cache file")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false", help="always download every page")
+    parser.add_argument("--checkpoint-dir", default="checkpoints", help="directory of the per-day append-only checkpoint files")
+    parser.add_argument("--resume", action="store_true", help="skip symbols already in the checkpoint of the snapshot date instead of starting over")
+    parser.add_argument("--refetch-missing", action="store_true", help="after scraping, load again only the tabs whose fields are still missing in the checkpoint of the snapshot date")
+    parser.add_argument("--snapshot-dir", default=y_fin_snapshots.SNAPSHOT_DIR, help="Parquet snapshot store the results are written to")
+    parser.add_argument("--snapshot-date", default=None, help="date of the snapshot partition, YYYY-MM-DD (default: today)")
+    parser.add_argument("--indicators", choices=["scraped", "local"], default="scraped", help="scrape the 52 week high/low and 50 day moving average, or compute them from the snapshot store's price history")
+    parser.add_argument("--indicator-state", default="indicator_state.pkl", help="with --indicators local, persisted indicator state file")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="INFO", help="DEBUG also logs every page load and field value")
+    parser.add_argument("--queue", default=None, help="shared SQLite work queue file; scrape the symbol list across several processes or machines")
+    parser.add_argument("--role", choices=["coordinator", "worker"], default="coordinator", help="with --queue, load the symbol list and write the results (coordinator) or only scrape leased symbols (worker)")
+    parser.add_argument("--reset-queue", action="store_true", help="with --queue, start the run over instead of resuming the symbols already queued for this snapshot date")
+    parser.add_argument("--batch-size", type=int, default=10, help="with --queue, symbols leased at a time")
+    parser.add_argument("--lease-seconds", type=float, default=300, help="with --queue, seconds without a heartbeat after which leased symbols go to other workers")
+    parser.add_argument("--poll-interval", type=float, default=5, help="with --queue, seconds between checks while other workers hold the remaining symbols")
+    parser.add_argument("--changes-dir", default=y_fin_diff.CHANGES_DIR, help="directory the change set against the previous snapshot is written to")
+    parser.add_argument("--metrics-dir", default=METRICS_DIR, help="directory the JSON metrics summary of the run is written to")
+    args = parser.parse_args(argv)
+    if args.queue and args.backend == "async":
+        parser.error("--queue works with the selenium and http backends")
+    return args
 
 # Main function to perform the tasks
-def main():
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(args.log_level)
+    metrics.reset()
+
     # Read the CSV file
-    df = pd.read_csv("ind_nifty500list_usecase3.csv")
-    
-    # Initialize the WebDriver
-    driver = initialize_driver()
-
-    if driver:
-        # Create a new DataFrame to store the results
-        results_df = pd.DataFrame(columns=['Company Name', 'Industry', 'Sector', 'Ticker', 'Share Price', 'Market Cap', 'Enterprise Value', 'Trailing P/E', 'PB', 'Beta', '52 Week High', '52 Week Low', '50-Day Moving Average', 'No. of employees', 'Indicator', 'Indicator_2'])
-
-        # Iterate through each symbol in the DataFrame
-        for index, row in df.iterrows():
-            symbol = row['Symbol']
-            company_name = row['Company Name']
-            industry = row['Industry']
-            print(f"Processing symbol: {symbol}...")
-            
-            # Scrape data for the symbol
-            market_cap, share_price, trailing_pe, price_to_book, beta, fifty_two_week_high, fifty_two_week_low, fifty_day_moving_avg, enterprise_value, sector, full_time_employees = scrape_company_data(driver, symbol)
-            if market_cap is not None and share_price is not None and trailing_pe is not None and price_to_book is not None and beta is not None and fifty_two_week_high is not None and fifty_two_week_low is not None and fifty_day_moving_avg is not None and enterprise_value is not None and sector is not None and full_time_employees is not None:
-                # Calculate additional fields
-                indicator = calculate_indicator(share_price, fifty_two_week_high, fifty_two_week_low)
-                indicator_2 = calculate_indicator_2(share_price, fifty_day_moving_avg)
-                
-                # Append the data to the results DataFrame
-                results_df.loc[len(results_df)] = [company_name, industry, sector, symbol, share_price, market_cap, enterprise_value, trailing_pe, price_to_book, beta, fifty_two_week_high, fifty_two_week_low, fifty_day_moving_avg, full_time_employees, indicator, indicator_2]
-
-        # Save the results to a new CSV file
-        results_df.to_csv("company_data_29_Mar.csv", index=False)
-        print("Results saved to company_data.csv")
-        
-        # Quit the WebDriver
-        driver.quit()
-        print("WebDriver closed.")
-    else:
-        print("WebDriver initialization failed. Exiting.")
+    df = pd.read_csv(args.input)
+    logger.info("event=run_start symbols=%d backend=%s workers=%d", len(df), args.backend, args.workers)
+
+    # Pages downloaded without a browser are cached on disk, so re-runs only fetch what expired
+    cache = None
+    if args.use_cache and args.backend in ("http", "async"):
+        import y_fin_cache
+        cache = y_fin_cache.PageCache(args.cache)
+
+    # With local indicators the 52 week and moving average fields are not scraped at all, once the snapshot store
+    # holds enough history for the engine to report them; until then they are still scraped
+    tab_fields = TAB_FIELDS
+    if args.indicators == "local":
+        import y_fin_indicators
+        if y_fin_indicators.has_enough_history(args.snapshot_date, args.snapshot_dir):
+            tab_fields = select_tab_fields(INDICATOR_FIELDS)
+        else:
+            logger.warning("event=indicators_scraped reason=short_history min_snapshots=%d", y_fin_indicators.MIN_PERIODS - 1)
+
+    try:
+        if args.queue:
+            # Sharded run: the symbols are leased from the shared work queue, which also holds the results
+            with metrics.timer("scrape_pass"):
+                queue_results = scrape_queue(df, args, cache, tab_fields)
+        else:
+            checkpoint_file = scrape_with_checkpoint(df, args, cache, tab_fields)
+    except ScraperUnavailableError as e:
+        # Nothing was scraped: the snapshot, change set and CSV of earlier runs are left as they are
+        logger.error("event=run_failed error=%r metrics=%s", str(e), metrics.write(args.metrics_dir))
+        return
+    finally:
+        if cache:
+            stats = cache.stats()
+            for name, value in stats.items():
+                if isinstance(value, (int, float)):
+                    metrics.count(f"page_cache_{name}", value)
+            logger.info("event=page_cache %s", " ".join(f"{name}={value}" for name, value in stats.items()))
+            cache.close()
+
+    # Worker nodes are done once the queue is drained; the coordinator writes the results
+    if args.queue and queue_results is None:
+        logger.info("event=run_done metrics=%s", metrics.write(args.metrics_dir))
+        return
+
+    # Build the results frame once from the queue or from the checkpoint, which holds this run's rows and any resumed ones
+    with metrics.timer("results_frame"):
+        results_df = queue_results if args.queue else y_fin_checkpoint.load_checkpoint_frame(checkpoint_file, SCRAPED_COLUMNS, df['Symbol'])
+        # An empty result would replace the day's snapshot and mark every ticker removed in the change set
+        if results_df.empty:
+            logger.error("event=run_failed error=%r metrics=%s", "no symbol was scraped", metrics.write(args.metrics_dir))
+            return
+        if args.indicators == "local":
+            import y_fin_indicators
+            results_df = y_fin_indicators.fill_local_indicators(results_df, args.snapshot_date, args.indicator_state, args.snapshot_dir)
+        results_df = y_fin_normalize.add_indicators(results_df)
+
+    # Store the results as a typed Parquet partition for the downstream reports, and as CSV for the existing readers
+    isin_codes = df.set_index('Symbol')['ISIN Code']
+    with metrics.timer("snapshot_write"):
+        snapshot_file = y_fin_snapshots.write_snapshot(results_df.assign(**{'ISIN Code': results_df['Ticker'].map(isin_codes)}), args.snapshot_date, args.snapshot_dir)
+    logger.info("event=snapshot_saved path=%s", snapshot_file)
+
+    # Compare with the previous snapshot, so the reports only redo the groups whose tickers moved
+    with metrics.timer("diff"):
+        diff = y_fin_diff.diff_with_previous_snapshot(results_df, args.snapshot_date, args.snapshot_dir)
+    if diff:
+        previous_date, changes = diff
+        metrics.count("changed_tickers", len(changes))
+        logger.info("event=changes_saved previous=%s changed=%d path=%s", previous_date, len(changes), y_fin_diff.write_changes(changes, args.snapshot_date, args.changes_dir))
+    with metrics.timer("csv_write"):
+        results_df.to_csv(args.output, index=False)
+    logger.info("event=results_saved path=%s rows=%d", args.output, len(results_df))
+    logger.info("event=run_done metrics=%s", metrics.write(args.metrics_dir))
 
 # Execute the main function
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
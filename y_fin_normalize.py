@@ -0,0 +1,116 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+# Multipliers of the magnitude suffixes used for Market Cap and Enterprise Value ("249.51B")
+SUFFIX_MULTIPLIERS = {'T': 1e12, 'B': 1e9, 'M': 1e6, 'k': 1e3}
+
+# Columns holding suffixed magnitudes; very high P/E ratios are shown as "1.85k" too
+SUFFIXED_COLUMNS = ['Market Cap', 'Enterprise Value', 'Trailing P/E']
+
+# Columns holding plain or comma-formatted numbers ("29,538.05", "1,052"); placeholders such as "N/A" become NaN
+NUMBER_COLUMNS = ['Share Price', 'PB', 'Beta', '52 Week High', '52 Week Low', '50-Day Moving Average', 'No. of employees']
+
+# Text columns repeating a handful of values across all companies, held as categoricals in memory
+CATEGORY_COLUMNS = ['Sector', 'Industry', 'Indicator', 'Indicator_2']
+
+# A plain decimal number, used to blank out placeholders before the float conversion
+NUMBER_PATTERN = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+
+# Function to convert a text column to float64; the direct cast covers clean columns, and only columns
+# with placeholders pay for the regex pass that turns them into NaN
+def text_to_float(text):
+    try:
+        return text.astype('float64')
+    except (TypeError, ValueError):
+        text = text.str.strip()
+        valid = text.str.fullmatch(NUMBER_PATTERN).fillna(False).astype(bool)
+        return text.where(valid).astype('float64')
+
+# Function to parse a column of numbers that may contain thousands separators into float64
+def parse_numbers(series):
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+    return text_to_float(series.astype('string').str.replace(',', '', regex=False))
+
+# Function to parse a column of suffixed magnitudes ("1.20T", "339.28B", "512.4M", "80k") into float64
+def parse_suffixed(series):
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+    text = series.astype('string').str.replace(',', '', regex=False).str.strip()
+    suffix = text.str[-1]
+    has_suffix = suffix.isin(list(SUFFIX_MULTIPLIERS)).fillna(False).astype(bool)
+    number = text.where(~has_suffix, text.str[:-1])
+    multiplier = suffix.map(SUFFIX_MULTIPLIERS).astype('float64').where(has_suffix, 1.0).to_numpy()
+    return text_to_float(number) * multiplier
+
+# Function to return a copy of scraped company data with every numeric column converted to float64
+def normalize_company_data(df):
+    df = df.copy()
+    for column in SUFFIXED_COLUMNS:
+        if column in df:
+            df[column] = parse_suffixed(df[column])
+    for column in NUMBER_COLUMNS:
+        if column in df:
+            df[column] = parse_numbers(df[column])
+    return df
+
+# Function to compute the "Indicator" column for whole columns at once:
+# within 5% of the 52 week high or low, empty otherwise or when a value is missing
+def indicator_column(share_price, fifty_two_week_high, fifty_two_week_low):
+    share_price = parse_numbers(share_price).to_numpy()
+    high = parse_numbers(fifty_two_week_high).to_numpy()
+    low = parse_numbers(fifty_two_week_low).to_numpy()
+    return np.select([share_price > high * 0.95, share_price < low * 1.05], ["Close to 52 week High", "Close to 52 week low"], default="")
+
+# Function to compute the "Indicator_2" column for whole columns at once: position against the 50 day moving average
+def indicator_2_column(share_price, fifty_day_moving_avg):
+    share_price = parse_numbers(share_price).to_numpy()
+    moving_avg = parse_numbers(fifty_day_moving_avg).to_numpy()
+    return np.select([np.isnan(share_price) | np.isnan(moving_avg), share_price > moving_avg], ["", "Above 50 day moving avg"], default="Below 50 day moving avg.")
+
+# Function to return a copy of the frame with both indicator columns (re)computed
+def add_indicators(df):
+    df = df.copy()
+    df['Indicator'] = indicator_column(df['Share Price'], df['52 Week High'], df['52 Week Low'])
+    df['Indicator_2'] = indicator_2_column(df['Share Price'], df['50-Day Moving Average'])
+    return df
+
+# Function to return a compact copy of normalized company data: the repeating text columns as categoricals,
+# integer columns downcast to the smallest type holding their values and, with float_dtype='float32', the numeric
+# columns at half their size (enough for panels and charts; the reports keep float64 values)
+def compact_company_data(df, float_dtype='float64'):
+    df = df.copy()
+    for column in df.columns:
+        if column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype('category')
+        elif pd.api.types.is_float_dtype(df[column]):
+            df[column] = df[column].astype(float_dtype)
+        elif pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+# Function to load a scraped company data CSV once, normalized to numbers and compacted, for the reports and the app
+def load_company_data(path="company_data.csv", float_dtype='float64'):
+    return compact_company_data(normalize_company_data(pd.read_csv(path)), float_dtype)
+
+# Function to report the memory held by every column of a frame, strings included: dtype, bytes and share of the total
+def memory_report(df):
+    usage = df.memory_usage(deep=True, index=False)
+    return pd.DataFrame({'dtype': df.dtypes.astype(str), 'bytes': usage, 'share %': (usage / usage.sum() * 100).round(1)})
+
+# Command line: compare the memory of a company data CSV as read and as loaded by load_company_data
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the memory used by company data as read and as compacted.")
+    parser.add_argument("--input", default="company_data.csv", help="scraped company data CSV")
+    parser.add_argument("--float32", action="store_true", help="also downcast the numeric columns to float32")
+    args = parser.parse_args(argv)
+
+    raw = pd.read_csv(args.input)
+    compact = load_company_data(args.input, 'float32' if args.float32 else 'float64')
+    report = memory_report(raw)[['dtype', 'bytes']].join(memory_report(compact)[['dtype', 'bytes']], lsuffix=' read', rsuffix=' compact')
+    print(report.to_string())
+    print(f"Total: {report['bytes read'].sum():,} bytes read, {report['bytes compact'].sum():,} bytes compact")
+
+if __name__ == "__main__":
+    main()
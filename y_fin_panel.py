@@ -0,0 +1,59 @@
+import argparse
+import pandas as pd
+
+from y_fin_snapshots import SNAPSHOT_DIR, read_snapshots
+
+# Function to stack the snapshots between start and end into one long frame indexed by (date, key).
+# Only the requested columns are read, the key is stored as a categorical, and value columns can be
+# downcast to float32, so a year of Nifty 500 history stays a few tens of MB.
+def load_panel(columns=('Share Price',), start=None, end=None, tickers=None, key='Ticker', dtype='float64', directory=SNAPSHOT_DIR):
+    columns = list(columns)
+    filters = [(key, 'in', list(tickers))] if tickers is not None else None
+    long_df = read_snapshots([key] + columns, start, end, filters, directory)
+    return to_long_panel(long_df, columns, key, dtype)
+
+# Function to stack daily frames that are already in memory ({date: frame}) the same way, in one concat pass
+def build_panel(frames, columns=('Share Price',), key='Ticker', dtype='float64'):
+    columns = list(columns)
+    long_df = pd.concat([frame[[key] + columns] for frame in frames.values()], keys=[pd.Timestamp(d) for d in frames], names=['date', None])
+    long_df = long_df.reset_index(level='date')
+    return to_long_panel(long_df, columns, key, dtype)
+
+# Function to index a stacked frame by (date, key), keeping the last row when a ticker appears twice on a date
+def to_long_panel(long_df, columns, key='Ticker', dtype='float64'):
+    long_df = long_df.drop_duplicates(subset=['date', key], keep='last')
+    long_df[key] = long_df[key].astype('category')
+    long_df[columns] = long_df[columns].astype(dtype)
+    return long_df.set_index(['date', key])[columns].sort_index()
+
+# Function to pivot one column of a long panel into a key x date table in a single pass
+def wide_panel(long_panel, column='Share Price'):
+    return long_panel[column].unstack('date')
+
+# Function to build the notebook's price table: Company Name followed by one "Share Price DD Mon" column per date
+def price_table(start=None, end=None, tickers=None, column='Share Price', directory=SNAPSHOT_DIR):
+    wide = wide_panel(load_panel([column], start, end, tickers, directory=directory), column)
+    wide.columns = [f"{column} {d:%d %b}" for d in wide.columns]
+    names = read_snapshots(['Ticker', 'Company Name'], start, end, directory=directory).drop_duplicates('Ticker', keep='last').set_index('Ticker')['Company Name']
+    wide.insert(0, 'Company Name', wide.index.map(names))
+    return wide.reset_index(drop=True)
+
+# Command line: write the price table for a date range, as the notebook's extracted_data.xlsx
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a multi-day price table from the snapshot store.")
+    parser.add_argument("--start", default=None, help="first date, YYYY-MM-DD")
+    parser.add_argument("--end", default=None, help="last date, YYYY-MM-DD")
+    parser.add_argument("--column", default="Share Price", help="snapshot column to tabulate")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot store directory")
+    parser.add_argument("--output", default="extracted_data.xlsx", help=".xlsx or .csv file to write")
+    args = parser.parse_args(argv)
+
+    table = price_table(args.start, args.end, column=args.column, directory=args.dir)
+    if args.output.endswith(".csv"):
+        table.to_csv(args.output, index=False)
+    else:
+        table.to_excel(args.output, index=False)
+    print(f"Price table with {len(table)} companies saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
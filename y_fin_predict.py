@@ -0,0 +1,150 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from y_fin_panel import load_panel, wide_panel
+from y_fin_snapshots import SNAPSHOT_DIR, read_latest_snapshot
+
+# Number of prior daily prices the model sees, as the three prior columns of the notebook's model
+LAGS = 3
+
+# File the trained model is persisted to, so daily scoring does not retrain
+MODEL_PATH = "price_model.joblib"
+
+# Bump when the features change, so a model trained on the old features is not reused
+FEATURE_VERSION = 1
+
+# Function to cut a ticker x date price table into every window of `lags` prior prices and the price that follows,
+# for all tickers at once. Prices are scaled by the last price of their window so one model fits companies of any
+# price level. Returns (X, y, ticker positions, target date positions); y is NaN when the next price is unknown.
+def feature_windows(wide, lags=LAGS):
+    prices = wide.to_numpy(dtype='float64')
+    if prices.shape[1] <= lags:
+        return np.empty((0, lags)), np.empty(0), np.empty(0, dtype=int), np.empty(0, dtype=int)
+    windows = sliding_window_view(prices, lags + 1, axis=1)
+    tickers, starts = np.indices(windows.shape[:2])
+    windows = windows.reshape(-1, lags + 1)
+    last_price = windows[:, lags - 1:lags]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaled = windows / last_price
+    X, y = scaled[:, :lags], scaled[:, lags]
+    # Windows with a missing or non-positive prior price cannot be scaled
+    valid = np.isfinite(X).all(axis=1) & (last_price[:, 0] > 0)
+    return X[valid], y[valid], tickers.ravel()[valid], starts.ravel()[valid] + lags
+
+# Function to build the scoring features of every ticker from its latest `lags` prices
+def latest_features(wide, lags=LAGS):
+    prices = wide.to_numpy(dtype='float64')[:, -lags:]
+    last_price = prices[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        X = prices / last_price[:, None]
+    valid = np.isfinite(X).all(axis=1) & (last_price > 0)
+    return X, last_price, valid
+
+# Function to fit one model on every complete window of the whole universe, using all cores
+def train_model(wide, lags=LAGS, n_estimators=100, n_jobs=-1, random_state=42):
+    from sklearn.ensemble import RandomForestRegressor
+
+    X, y, _, _ = feature_windows(wide, lags)
+    known = np.isfinite(y)
+    if not known.any():
+        raise ValueError(f"Need at least {lags + 1} snapshot dates to train the model")
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state, n_jobs=n_jobs)
+    model.fit(X[known], y[known])
+    return model
+
+# Function to predict the next price of every ticker in a single batched predict call; NaN when a ticker
+# lacks `lags` recent prices
+def predict_next_prices(model, wide, lags=LAGS):
+    X, last_price, valid = latest_features(wide, lags)
+    predictions = np.full(len(wide), np.nan)
+    if valid.any():
+        predictions[valid] = model.predict(X[valid]) * last_price[valid]
+    return pd.Series(predictions, index=wide.index, name='Predicted Share Price')
+
+# Function to persist a trained model along with the settings it was trained with
+def save_model(model, path=MODEL_PATH, lags=LAGS, trained_through=None):
+    import joblib
+
+    bundle = {'model': model, 'lags': lags, 'feature_version': FEATURE_VERSION, 'trained_through': trained_through}
+    joblib.dump(bundle, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+# Function to load a persisted model; returns (model, lags, trained through date) or None when there is no
+# usable model
+def load_model(path=MODEL_PATH):
+    import joblib
+
+    if not os.path.exists(path):
+        return None
+    bundle = joblib.load(path)
+    if bundle.get('feature_version') != FEATURE_VERSION:
+        return None
+    return bundle['model'], bundle['lags'], bundle['trained_through']
+
+# Function to load the ticker x date price table the model works on
+def load_price_table(start=None, end=None, tickers=None, column='Share Price', directory=SNAPSHOT_DIR):
+    return wide_panel(load_panel([column], start, end, tickers, directory=directory), column)
+
+# Function to train and persist the model on the stored snapshots
+def train(path=MODEL_PATH, start=None, end=None, lags=LAGS, n_estimators=100, n_jobs=-1, directory=SNAPSHOT_DIR):
+    wide = load_price_table(start, end, directory=directory)
+    model = train_model(wide, lags, n_estimators, n_jobs)
+    trained_through = wide.columns[-1].date().isoformat()
+    save_model(model, path, lags, trained_through)
+    return model, lags, trained_through
+
+# Function to score every ticker with the persisted model (training it first if there is none yet).
+# Returns a frame of Company Name, Ticker, last Share Price and Predicted Share Price.
+def predict(path=MODEL_PATH, retrain=False, lags=LAGS, directory=SNAPSHOT_DIR):
+    loaded = None if retrain else load_model(path)
+    if loaded is None:
+        print(f"Training a new model ({path})...")
+        loaded = train(path, lags=lags, directory=directory)
+    model, lags, _ = loaded
+    # Only the latest `lags` dates are needed for scoring
+    wide = load_price_table(directory=directory)
+    wide = wide.iloc[:, -lags:]
+    predictions = predict_next_prices(model, wide, lags)
+
+    names = read_latest_snapshot(['Ticker', 'Company Name'], directory).drop_duplicates('Ticker').set_index('Ticker')['Company Name']
+    result = pd.DataFrame({
+        'Company Name': wide.index.map(names),
+        'Ticker': wide.index.astype(str),
+        'Share Price': wide.iloc[:, -1].to_numpy(),
+        'Predicted Share Price': predictions.to_numpy(),
+    })
+    return result
+
+# Command line: train the model or predict the next share price of every company
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the share price model or predict the next share prices.")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot store directory")
+    parser.add_argument("--model", default=MODEL_PATH, help="persisted model file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    train_parser = subparsers.add_parser("train", help="train the model on the stored snapshots")
+    train_parser.add_argument("--start", default=None, help="first date, YYYY-MM-DD")
+    train_parser.add_argument("--end", default=None, help="last date, YYYY-MM-DD")
+    train_parser.add_argument("--lags", type=int, default=LAGS, help="prior prices per feature window")
+    train_parser.add_argument("--trees", type=int, default=100, help="number of trees")
+    train_parser.add_argument("--jobs", type=int, default=-1, help="parallel jobs (-1 = all cores)")
+    predict_parser = subparsers.add_parser("predict", help="predict the next share price of every company")
+    predict_parser.add_argument("--retrain", action="store_true", help="retrain before predicting")
+    predict_parser.add_argument("--output", default="predicted_share_prices.csv", help=".xlsx or .csv file to write")
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        _, _, trained_through = train(args.model, args.start, args.end, args.lags, args.trees, args.jobs, args.dir)
+        print(f"Model trained on snapshots through {trained_through} saved to {args.model}")
+    else:
+        result = predict(args.model, args.retrain, directory=args.dir)
+        if args.output.endswith(".csv"):
+            result.to_csv(args.output, index=False)
+        else:
+            result.to_excel(args.output, index=False)
+        print(f"Predictions for {result['Predicted Share Price'].notna().sum()} companies saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
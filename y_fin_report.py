@@ -0,0 +1,304 @@
+import argparse
+import io
+import math
+import os
+import pandas as pd
+
+# Fill colors of the highlighted cells; ReportWriter turns them into openpyxl style objects once per workbook,
+# so openpyxl is only imported when a workbook is actually written
+ORANGE_FILL = "FFA500"  # Close to 52 week High
+BLUE_FILL = "ADD8E6"  # Close to 52 week low
+YELLOW_FILL = "FFFF00"  # Highest value in the group
+GREEN_FILL = "00FF00"  # Lowest value in the group
+
+# Fills of the Indicator cells
+INDICATOR_FILLS = {
+    'Close to 52 week High': ORANGE_FILL,
+    'Close to 52 week low': BLUE_FILL,
+}
+
+# Columns whose extreme value is highlighted in every group: (column, highlight the largest?, fill)
+EXTREME_RULES = [
+    ('Market Cap', True, YELLOW_FILL),
+    ('Enterprise Value', True, YELLOW_FILL),
+    ('PB', True, YELLOW_FILL),
+    ('No. of employees', True, YELLOW_FILL),
+    ('Trailing P/E', False, GREEN_FILL),
+    ('Beta', False, GREEN_FILL),
+]
+
+# Columns written with a thousands separator
+MONEY_COLUMNS = ['Market Cap', 'Enterprise Value']
+MONEY_FORMAT = '#,##0.00'
+
+# Statistics reported for every group: (statistic, source column, aggregation). They are computed in one
+# groupby().agg pass over the combination of all grouping keys and rolled up to each key from the partial results.
+GROUP_STATISTICS = [
+    ('Companies', 'Ticker', 'size'),
+    ('Average P/E', 'Trailing P/E', 'mean'),
+    ('Average P/B', 'PB', 'mean'),
+    ('Average Beta', 'Beta', 'mean'),
+    ('Average Market Cap', 'Market Cap', 'mean'),
+    ('Average Employee to Market Cap Ratio', 'Employee to Market Cap Ratio', 'mean'),
+    ('Highest Market Cap', 'Market Cap', 'max'),
+    ('Highest Enterprise Value', 'Enterprise Value', 'max'),
+    ('Highest PB', 'PB', 'max'),
+    ('Most Employees', 'No. of employees', 'max'),
+    ('Lowest P/E', 'Trailing P/E', 'min'),
+    ('Lowest Beta', 'Beta', 'min'),
+    ('Close to 52 Week High', 'Close to 52 Week High', 'sum'),
+]
+
+# How the partial results of each aggregation are combined when rolling up to a coarser key
+ROLLUP = {'size': 'sum', 'sum': 'sum', 'count': 'sum', 'max': 'max', 'min': 'min'}
+
+# Function to compute GROUP_STATISTICS for every grouping key at once: {key: frame indexed by the key's groups}
+def group_statistics(df, keys):
+    keys = list(keys)
+    data = df.assign(**{
+        'Employee to Market Cap Ratio': df['No. of employees'] / df['Market Cap'],
+        'Close to 52 Week High': (df['Indicator'] == 'Close to 52 week High').astype('int64') if 'Indicator' in df else 0,
+    })
+    # Means are rolled up from sums and counts, everything else from the aggregation itself
+    partials = {}
+    for _, column, how in GROUP_STATISTICS:
+        for part in (('sum', 'count') if how == 'mean' else (how,)):
+            partials[f"{column}|{part}"] = (column, part)
+    finest = data.groupby(keys, dropna=False, observed=True, sort=False).agg(**partials)
+
+    statistics = {}
+    for key in keys:
+        rolled = finest.groupby(level=key).agg({name: ROLLUP[name.rsplit('|', 1)[1]] for name in partials})
+        stats = pd.DataFrame(index=rolled.index)
+        for name, column, how in GROUP_STATISTICS:
+            if how == 'mean':
+                stats[name] = rolled[f"{column}|sum"] / rolled[f"{column}|count"]
+            else:
+                stats[name] = rolled[f"{column}|{how}"]
+        statistics[key] = stats
+    return statistics
+
+# Function to compute the highlighted cells of the report for every grouping key: {key: {(row index, column): fill color}}.
+# Each rule sorts the rows once (stably, so ties go to the first row like idxmax/idxmin) and every key takes its
+# groups' first rows from that order; groups without any value are skipped.
+def highlight_fills_by_key(df, keys):
+    keys = list(keys)
+    indicator_fills = {}
+    if 'Indicator' in df:
+        for indicator, fill in INDICATOR_FILLS.items():
+            for index in df.index[df['Indicator'] == indicator]:
+                indicator_fills[(index, 'Indicator')] = fill
+    fills = {key: dict(indicator_fills) for key in keys}
+    for column, largest, fill in EXTREME_RULES:
+        if column not in df:
+            continue
+        ordered = df[keys + [column]].dropna(subset=[column]).sort_values(column, ascending=not largest, kind="stable")
+        for key in keys:
+            for index in ordered.dropna(subset=[key]).drop_duplicates(key).index:
+                fills[key][(index, column)] = fill
+    return fills
+
+# Report workbook written in openpyxl's write-only mode: rows are streamed to disk as they are appended,
+# so memory stays constant however many companies the report holds
+class ReportWriter:
+    def __init__(self, path, title=None, column_widths=None):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, PatternFill
+
+        # Style objects shared by every cell of the report instead of being allocated per cell
+        self.cell_type = WriteOnlyCell
+        self.bold_font = Font(bold=True)
+        self.fills = {color: PatternFill(start_color=color, end_color=color, fill_type="solid") for color in [ORANGE_FILL, BLUE_FILL, YELLOW_FILL, GREEN_FILL]}
+
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(title)
+        # Column widths must be set before the first row is written
+        for letter, width in (column_widths or {}).items():
+            self.sheet.column_dimensions[letter].width = width
+        self.row_idx = 1
+
+    # Function to turn a value into a cell, styled only when needed; NaN becomes an empty cell
+    def make_cell(self, value, bold=False, fill=None, number_format=None):
+        if isinstance(value, float) and math.isnan(value):
+            value = None
+        if not bold and fill is None and number_format is None:
+            return value
+        cell = self.cell_type(self.sheet, value=value)
+        if bold:
+            cell.font = self.bold_font
+        if fill is not None:
+            cell.fill = self.fills[fill]
+        if number_format is not None:
+            cell.number_format = number_format
+        return cell
+
+    # Function to append one row of values, optionally in bold
+    def write_row(self, values, bold=False):
+        self.sheet.append([self.make_cell(value, bold) for value in values])
+        self.row_idx += 1
+
+    # Function to append empty rows
+    def write_blank(self, count=1):
+        for _ in range(count):
+            self.sheet.append([])
+        self.row_idx += count
+
+    # Function to append the rows of one group of companies with their highlights and number formats
+    def write_company_rows(self, data, columns, fills):
+        formats = [MONEY_FORMAT if column in MONEY_COLUMNS else None for column in columns]
+        for index, values in zip(data.index, data[columns].itertuples(index=False, name=None)):
+            self.sheet.append([self.make_cell(value, fill=fills.get((index, column)), number_format=number_format) for column, value, number_format in zip(columns, values, formats)])
+            self.row_idx += 1
+
+    # Function to anchor an image at the current row and reserve `rows` rows for it
+    def add_image(self, image, rows=20):
+        self.sheet.add_image(image, f"A{self.row_idx}")
+        self.write_blank(rows)
+
+    # Function to write a frame (with its index) to a sheet of its own, after the main sheet
+    def write_table(self, title, frame):
+        sheet = self.workbook.create_sheet(title)
+        headers = []
+        for name in [frame.index.name] + list(frame.columns):
+            cell = self.cell_type(sheet, value=name)
+            cell.font = self.bold_font
+            headers.append(cell)
+        sheet.append(headers)
+        for index, values in zip(frame.index, frame.itertuples(index=False, name=None)):
+            sheet.append([None if isinstance(value, float) and math.isnan(value) else value for value in (index,) + values])
+
+    def save(self):
+        self.workbook.save(self.path)
+
+# Layout of the report of each grouping key
+REPORT_LAYOUTS = {
+    'Sector': {
+        'path': "company_data_segregated_by_sector.xlsx",
+        'header': True,  # column headers once at the top of the sheet
+        'charts': True,  # chart panel under every group, with the group's correlation heatmap
+        'column_widths': None,
+        'summary': False,  # group with the highest share price at the end
+        'correlation': False,  # sheet of per-group average return correlation and volatility
+    },
+    'Industry': {
+        'path': "company_data_segregated_by_industry.xlsx",
+        'header': False,
+        'charts': False,
+        'column_widths': {'A': 20, 'D': 25, 'E': 25},
+        'summary': True,
+        'correlation': True,
+    },
+}
+
+# Averages written under every group: (label, statistic)
+AVERAGE_ROWS = [("Average P/E:", 'Average P/E'), ("Average P/B:", 'Average P/B'), ("Average Beta:", 'Average Beta')]
+
+# Function to write the report of one grouping key from the shared statistics and highlights
+def write_group_report(df, key, stats, fills, layout, path=None, charts=None, correlation_summary=None):
+    columns = [column for column in df.columns if column not in ['Sector', 'Industry']]
+    report = ReportWriter(path or layout['path'], column_widths=layout['column_widths'])
+    if layout['header']:
+        report.write_row(columns, bold=True)
+
+    for group, data in df.groupby(key):
+        # Group name, column headers and the group's companies
+        report.write_row([group], bold=True)
+        report.write_row(columns, bold=True)
+        report.write_company_rows(data, columns, fills)
+        report.write_blank()
+
+        # Averages of the group, then its chart panel if the layout has one
+        for label, name in AVERAGE_ROWS:
+            report.write_row([label, stats.at[group, name]], bold=True)
+        report.write_blank()
+        if charts is not None:
+            from openpyxl.drawing.image import Image
+            report.add_image(Image(io.BytesIO(charts[group])), rows=20)
+
+    if layout['summary']:
+        # The group with the highest average Market Cap, and how many of its shares are close to their 52 week high
+        top_group = stats['Average Market Cap'].idxmax()
+        report.write_row([f"{key} with Highest Share Price:", top_group], bold=True)
+        report.write_row([f"Shares Close to 52 Week High in Highest Share Price {key}:", int(stats.at[top_group, 'Close to 52 Week High'])], bold=True)
+
+    report.write_table(f"{key} Statistics", stats)
+    if correlation_summary is not None:
+        report.write_table(f"{key} Correlation", correlation_summary)
+    report.save()
+    return report.path
+
+# Function to build the reports of several grouping keys from one load of the data: the statistics and highlighted
+# cells of all keys are computed together, and every report is written from that shared result.
+# `df` is normalized company data; returns the paths written. `correlation` is a y_fin_correlation.CorrelationMatrix;
+# by default the cached matrices of the latest snapshot are used, and the correlation parts are left out without one.
+def build_reports(df, keys=('Sector', 'Industry'), paths=None, changes=None, correlation=None):
+    from y_fin_charts import render_group_charts
+    import y_fin_correlation
+
+    keys = list(keys)
+    written = []
+    # One universe-wide matrix pass, sliced per group below
+    if correlation is None:
+        correlation = y_fin_correlation.load_correlation()
+
+    # With a change set (see y_fin_diff), a report none of whose groups changed is kept as it is. The heatmaps and
+    # correlation sheet follow the return window, which moves with every snapshot, so a report holding them is
+    # only kept when there is no return history.
+    if changes is not None:
+        from y_fin_diff import changed_groups
+        changed = {key: changed_groups(changes, key) for key in keys}
+        for key in list(keys):
+            layout = REPORT_LAYOUTS[key]
+            path = (paths or {}).get(key) or layout['path']
+            uses_returns = correlation is not None and (layout['charts'] or layout['correlation'])
+            if not changed[key] and not uses_returns and os.path.exists(path):
+                print(f"No {key.lower()} changed, keeping {path}")
+                written.append(path)
+                keys.remove(key)
+
+    if not keys:
+        return written
+
+    statistics = group_statistics(df, keys)
+    fills = highlight_fills_by_key(df, keys)
+    for key in keys:
+        layout = REPORT_LAYOUTS[key]
+        # Render the chart panel of every group in a process pool; groups whose data did not change come from the chart cache
+        charts = None
+        if layout['charts']:
+            groups = {group: data for group, data in df.groupby(key)}
+            correlations = y_fin_correlation.group_correlations(correlation, df, key) if correlation is not None else None
+            charts = render_group_charts(groups, correlations=correlations)
+        summary = y_fin_correlation.correlation_summary(correlation, df, key) if layout['correlation'] and correlation is not None else None
+        written.append(write_group_report(df, key, statistics[key], fills[key], layout, (paths or {}).get(key), charts, summary))
+    return written
+
+# Command line: write the grouped reports of company_data.csv
+def main(argv=None):
+    from y_fin_correlation import load_correlation
+    from y_fin_normalize import load_company_data
+    from y_fin_snapshots import SNAPSHOT_DIR
+
+    parser = argparse.ArgumentParser(description="Write the company reports grouped by sector and/or industry.")
+    parser.add_argument("--input", default="company_data.csv", help="scraped company data CSV")
+    parser.add_argument("--by", nargs="+", choices=list(REPORT_LAYOUTS), default=list(REPORT_LAYOUTS), help="grouping keys to report")
+    parser.add_argument("--snapshot-date", default=None, help="snapshot date whose return correlation the reports use (default: latest)")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR, help="Parquet snapshot store the return history is read from")
+    parser.add_argument("--changes", default=None, help="change set CSV written by y_fin_diff; a report none of whose groups changed is kept")
+    args = parser.parse_args(argv)
+
+    changes = None
+    if args.changes:
+        from y_fin_diff import read_changes
+        changes = read_changes(args.changes)
+
+    # Read the scraped company data once for all reports, with numbers and categoricals instead of text
+    df = load_company_data(args.input)
+    correlation = load_correlation(args.snapshot_date, directory=args.snapshot_dir)
+    for path in build_reports(df, args.by, changes=changes, correlation=correlation):
+        print(f"Report saved to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import operator
+import re
+import numpy as np
+import pandas as pd
+
+# Text columns indexed by group: rows of the same value are stored contiguously, with one offset per value
+GROUP_COLUMNS = ['Sector', 'Industry', 'Indicator', 'Indicator_2']
+
+# Comparison operators of the filters, as in the pandas-style [(column, op, value), ...] filters of the snapshot store
+OPERATORS = {'==': operator.eq, '!=': operator.ne, '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+# Function to add the derived screening columns to normalized company data
+def add_screening_columns(df):
+    return df.assign(**{'Employee to Market Cap Ratio': df['No. of employees'] / df['Market Cap']})
+
+# Rows of one text column grouped by value: the row positions of every value are the slice
+# order[offsets[code]:offsets[code + 1]], where code is the value's position in `values`
+class GroupIndex:
+    def __init__(self, column):
+        codes, values = pd.factorize(column, sort=True)
+        self.codes = codes
+        self.values = list(values)
+        self.code_of = {value: code for code, value in enumerate(self.values)}
+        # Rows without a value (code -1) sort first and are left out
+        order = np.argsort(codes, kind="stable")
+        self.order = order[np.count_nonzero(codes < 0):]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[codes >= 0], minlength=len(self.values)))])
+
+    # Function to return the row positions holding a value
+    def rows(self, value):
+        code = self.code_of.get(value)
+        if code is None:
+            return np.empty(0, dtype='int64')
+        return self.order[self.offsets[code]:self.offsets[code + 1]]
+
+# Precomputed index over one normalized snapshot answering filter + top-N queries without scanning every row:
+# each numeric column keeps its rows sorted by value, each group column keeps the rows of every value contiguous,
+# and the per-group top-N orders are built on first use and kept
+class ScreenerIndex:
+    def __init__(self, df):
+        self.data = add_screening_columns(df).reset_index(drop=True)
+        self.numeric_columns = [column for column in self.data.columns if pd.api.types.is_float_dtype(self.data[column]) or pd.api.types.is_integer_dtype(self.data[column])]
+        self.values = {column: self.data[column].to_numpy(dtype='float64') for column in self.numeric_columns}
+
+        # Ascending order and sorted values of every numeric column; missing values sort last
+        self.sorted_positions = {}
+        self.sorted_values = {}
+        self.valid_counts = {}
+        for column, values in self.values.items():
+            order = np.argsort(values, kind="stable")
+            self.sorted_positions[column] = order
+            self.sorted_values[column] = values[order]
+            self.valid_counts[column] = np.count_nonzero(~np.isnan(values))
+
+        self.groups = {column: GroupIndex(self.data[column]) for column in GROUP_COLUMNS if column in self.data}
+        self.orders = {}
+
+    # Function to build the index from the latest snapshot of the store
+    @classmethod
+    def from_latest_snapshot(cls, directory=None):
+        import y_fin_snapshots
+        return cls(y_fin_snapshots.read_latest_snapshot(directory=directory or y_fin_snapshots.SNAPSHOT_DIR))
+
+    # Function to return the rows of a numeric column ordered by value (largest first unless ascending), without missing values
+    def column_order(self, column, ascending=True):
+        if (None, column, ascending) not in self.orders:
+            values = self.values[column] if ascending else -self.values[column]
+            self.orders[(None, column, ascending)] = np.argsort(values, kind="stable")[:self.valid_counts[column]]
+        return self.orders[(None, column, ascending)]
+
+    # Function to return the rows ordered by group, then by a numeric column, with the offsets and valid row counts
+    # of every group; missing values sort last within their group
+    def group_order(self, key, column, ascending=True):
+        if (key, column, ascending) not in self.orders:
+            group = self.groups[key]
+            values = self.values[column] if ascending else -self.values[column]
+            order = np.lexsort((values, group.codes))[len(self.data) - len(group.order):]
+            valid = np.bincount(group.codes[(group.codes >= 0) & ~np.isnan(values)], minlength=len(group.values))
+            self.orders[(key, column, ascending)] = (order, group.offsets, valid)
+        return self.orders[(key, column, ascending)]
+
+    # Function to return the rows matching one filter, or None when the filter is cheaper to check on other candidates
+    def filter_rows(self, column, op, value):
+        if column in self.groups and op == '==':
+            return self.groups[column].rows(value)
+        if column in self.groups and op == 'in':
+            return np.concatenate([self.groups[column].rows(item) for item in value] + [np.empty(0, dtype='int64')])
+        if column in self.values and op in ('<', '<=', '>', '>=', '=='):
+            # A range of the column's sorted values, found by binary search
+            sorted_values = self.sorted_values[column][:self.valid_counts[column]]
+            first, last = 0, len(sorted_values)
+            if op in ('>', '>='):
+                first = np.searchsorted(sorted_values, value, side='right' if op == '>' else 'left')
+            if op in ('<', '<='):
+                last = np.searchsorted(sorted_values, value, side='left' if op == '<' else 'right')
+            if op == '==':
+                first, last = np.searchsorted(sorted_values, value, side='left'), np.searchsorted(sorted_values, value, side='right')
+            return self.sorted_positions[column][first:last]
+        return None
+
+    # Function to check one filter on candidate rows
+    def check(self, rows, column, op, value):
+        values = self.values[column][rows] if column in self.values else self.data[column].to_numpy()[rows]
+        if op == 'in':
+            return np.isin(values, list(value))
+        with np.errstate(invalid='ignore'):
+            return OPERATORS[op](values, value)
+
+    # Function to answer a screen: the rows matching every (column, op, value) filter, optionally ordered by a
+    # column and cut to the first `top` rows overall or, with per_group, in each group of that key.
+    # The most selective indexed filter gives the candidate rows; the other filters are only checked on those.
+    def query(self, filters=None, sort_by=None, ascending=True, top=None, per_group=None, columns=None):
+        filters = [tuple(condition) for condition in filters or []]
+        for column, op, _ in filters:
+            if column not in self.data or (op not in OPERATORS and op != 'in'):
+                raise ValueError(f"Unsupported filter on {column!r} with {op!r}")
+        if sort_by is not None and sort_by not in self.values:
+            raise ValueError(f"Cannot sort by {sort_by!r}")
+        if per_group is not None and (per_group not in self.groups or sort_by is None or top is None):
+            raise ValueError("per_group needs a group column, sort_by and top")
+
+        rows = None
+        candidates = [(condition, self.filter_rows(*condition)) for condition in filters]
+        indexed = [(condition, found) for condition, found in candidates if found is not None]
+        if indexed:
+            condition, rows = min(indexed, key=lambda item: len(item[1]))
+            remaining = [other for other in filters if other is not condition]
+        else:
+            remaining = filters
+
+        if rows is None and not remaining and sort_by is not None:
+            # No filter: the precomputed orders answer top-N directly
+            if per_group is None:
+                rows = self.column_order(sort_by, ascending)[:top]
+            else:
+                order, offsets, valid = self.group_order(per_group, sort_by, ascending)
+                rows = np.concatenate([order[offsets[code]:offsets[code] + min(top, valid[code])] for code in range(len(valid))] + [np.empty(0, dtype='int64')])
+        else:
+            if rows is None:
+                rows = np.arange(len(self.data))
+            for condition in remaining:
+                rows = rows[self.check(rows, *condition)]
+            if sort_by is not None:
+                values = self.values[sort_by][rows]
+                rows = rows[~np.isnan(values)]
+                values = values[~np.isnan(values)]
+                # np.lexsort sorts by its last key first: group, then value, then row position for ties
+                keys = (rows, values if ascending else -values)
+                if per_group is not None:
+                    keys = keys + (self.groups[per_group].codes[rows],)
+                rows = rows[np.lexsort(keys)]
+                if per_group is not None:
+                    codes = self.groups[per_group].codes[rows]
+                    rows = rows[(codes >= 0) & (pd.Series(codes).groupby(codes).cumcount().to_numpy() < top)]
+                else:
+                    rows = rows[:top]
+            else:
+                rows = np.sort(rows)
+
+        result = self.data.iloc[rows]
+        return result if columns is None else result[list(columns)]
+
+# Function to parse a command line filter such as "Beta<0.5" or "Indicator==Close to 52 week High"
+def parse_filter(text, numeric_columns):
+    match = re.fullmatch(r"\s*(.+?)\s*(==|!=|<=|>=|<|>)\s*(.+?)\s*", text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Cannot parse filter {text!r}")
+    column, op, value = match.groups()
+    return column, op, float(value) if column in numeric_columns else value
+
+# Command line: screen the latest snapshot (or a company_data CSV) and print the matching companies
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen companies with filters and top-N queries.")
+    parser.add_argument("--input", default=None, help="company_data CSV to screen instead of the latest snapshot")
+    parser.add_argument("--where", action="append", default=[], help='filter such as "Beta<0.5" or "Indicator==Close to 52 week High"; repeatable')
+    parser.add_argument("--sort", default=None, help="numeric column to order by")
+    parser.add_argument("--descending", action="store_true", help="largest values first")
+    parser.add_argument("--top", type=int, default=None, help="number of companies (per group with --per)")
+    parser.add_argument("--per", default=None, choices=GROUP_COLUMNS, help="take the top companies of every group of this column")
+    parser.add_argument("--columns", nargs="+", default=['Company Name', 'Ticker', 'Sector', 'Industry', 'Share Price', 'Market Cap', 'Trailing P/E', 'Beta', 'Indicator'], help="columns to print")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        from y_fin_normalize import normalize_company_data
+        index = ScreenerIndex(normalize_company_data(pd.read_csv(args.input)))
+    else:
+        index = ScreenerIndex.from_latest_snapshot()
+    filters = [parse_filter(text, index.numeric_columns) for text in args.where]
+    columns = list(dict.fromkeys(args.columns + ([args.sort] if args.sort else [])))
+    result = index.query(filters, args.sort, not args.descending, args.top, args.per, columns)
+    print(result.to_string(index=False))
+    print(f"{len(result)} companies")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import datetime
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from y_fin_normalize import CATEGORY_COLUMNS, normalize_company_data
+
+# Root directory of the snapshot store; every scrape lives in its own date=YYYY-MM-DD partition
+SNAPSHOT_DIR = "snapshots"
+
+# Name of the data file inside each partition
+SNAPSHOT_FILE = "company_data.parquet"
+
+# Columns of a snapshot, in the order of the scraper output plus the ISIN of the symbol list
+SNAPSHOT_COLUMNS = ['Company Name', 'Industry', 'Sector', 'Ticker', 'ISIN Code', 'Share Price', 'Market Cap', 'Enterprise Value', 'Trailing P/E', 'PB', 'Beta', '52 Week High', '52 Week Low', '50-Day Moving Average', 'No. of employees', 'Indicator', 'Indicator_2']
+
+# Text columns of a snapshot; every other column is float64
+TEXT_COLUMNS = ['Company Name', 'Industry', 'Sector', 'Ticker', 'ISIN Code', 'Indicator', 'Indicator_2']
+
+# Fixed schema of every partition, so files written from old exports and new scrapes always line up
+SNAPSHOT_SCHEMA = pa.schema([(column, pa.string() if column in TEXT_COLUMNS else pa.float64()) for column in SNAPSHOT_COLUMNS])
+
+# Hive-style partitioning on a typed date column, so date ranges are pruned without opening files
+DATE_PARTITIONING = ds.partitioning(pa.schema([('date', pa.date32())]), flavor="hive")
+
+# Function to turn a date given as datetime.date or "YYYY-MM-DD" text into a datetime.date
+def to_date(value):
+    if value is None or isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
+
+# Function to build the partition directory of one snapshot date
+def partition_dir(snapshot_date, directory=SNAPSHOT_DIR):
+    return os.path.join(directory, f"date={to_date(snapshot_date):%Y-%m-%d}")
+
+# Function to write one scrape as a typed, zstd-compressed Parquet partition; an existing partition for the date is replaced
+def write_snapshot(df, snapshot_date=None, directory=SNAPSHOT_DIR):
+    snapshot_date = to_date(snapshot_date) or datetime.date.today()
+    df = normalize_company_data(df).reindex(columns=SNAPSHOT_SCHEMA.names)
+    for column in TEXT_COLUMNS:
+        df[column] = df[column].astype('string')
+    table = pa.Table.from_pandas(df, schema=SNAPSHOT_SCHEMA, preserve_index=False)
+
+    target_dir = partition_dir(snapshot_date, directory)
+    os.makedirs(target_dir, exist_ok=True)
+    target = os.path.join(target_dir, SNAPSHOT_FILE)
+    # Hidden temporary name, so readers never pick up a half-written file
+    temporary = os.path.join(target_dir, "." + SNAPSHOT_FILE + ".tmp")
+    pq.write_table(table, temporary, compression="zstd")
+    os.replace(temporary, target)
+    return target
+
+# Function to list the dates held by the store, oldest first
+def list_snapshot_dates(directory=SNAPSHOT_DIR):
+    if not os.path.isdir(directory):
+        return []
+    dates = []
+    for name in os.listdir(directory):
+        if name.startswith("date=") and os.path.exists(os.path.join(directory, name, SNAPSHOT_FILE)):
+            dates.append(to_date(name[len("date="):]))
+    return sorted(dates)
+
+# Function to open the whole store as one pyarrow dataset
+def open_store(directory=SNAPSHOT_DIR):
+    schema = SNAPSHOT_SCHEMA.append(pa.field('date', pa.date32()))
+    return ds.dataset(directory, schema=schema, format="parquet", partitioning=DATE_PARTITIONING)
+
+# Function to load selected columns of the snapshots between start and end (inclusive). `filters` takes a pyarrow
+# expression or pandas-style [(column, op, value), ...] tuples; date and column predicates are pushed down to the
+# Parquet reader, so only matching partitions and row groups are decoded.
+def read_snapshots(columns=None, start=None, end=None, filters=None, directory=SNAPSHOT_DIR):
+    if not list_snapshot_dates(directory):
+        return pd.DataFrame(columns=['date'] + list(columns or []))
+
+    expression = None
+    if filters is not None:
+        expression = filters if isinstance(filters, ds.Expression) else pq.filters_to_expression(filters)
+    if start is not None:
+        condition = ds.field('date') >= to_date(start)
+        expression = condition if expression is None else expression & condition
+    if end is not None:
+        condition = ds.field('date') <= to_date(end)
+        expression = condition if expression is None else expression & condition
+
+    if columns is not None:
+        columns = ['date'] + [column for column in columns if column != 'date']
+    table = open_store(directory).to_table(columns=columns, filter=expression)
+    # Sector, Industry and the indicators repeat a few values on every row of every date; they come back as categoricals
+    return table.to_pandas(date_as_object=False, categories=[column for column in CATEGORY_COLUMNS if column in table.column_names])
+
+# Function to load one snapshot date
+def read_snapshot(snapshot_date, columns=None, filters=None, directory=SNAPSHOT_DIR):
+    return read_snapshots(columns, snapshot_date, snapshot_date, filters, directory).drop(columns='date')
+
+# Function to load the most recent snapshot, or None if the store is empty
+def read_latest_snapshot(columns=None, directory=SNAPSHOT_DIR):
+    dates = list_snapshot_dates(directory)
+    if not dates:
+        return None
+    return read_snapshot(dates[-1], columns, directory=directory)
+
+# Function to export one snapshot to Excel or CSV for people who want a spreadsheet
+def export_snapshot(snapshot_date, path, columns=None, directory=SNAPSHOT_DIR):
+    df = read_snapshot(snapshot_date, columns, directory=directory)
+    if path.endswith(".csv"):
+        df.to_csv(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+    return path
+
+# Function to import a dated CSV/XLSX output of the old pipeline (e.g. company_data_31_Mar.xlsx) into the store
+def import_legacy_file(path, snapshot_date, directory=SNAPSHOT_DIR):
+    df = pd.read_csv(path) if path.endswith(".csv") else pd.read_excel(path)
+    return write_snapshot(df, snapshot_date, directory)
+
+# Command line: import legacy files, export a snapshot, or list the stored dates
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the Parquet snapshot store of scraped company data.")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot store directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="import a dated CSV/XLSX file")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--date", required=True, help="snapshot date, YYYY-MM-DD")
+    export_parser = subparsers.add_parser("export", help="export one snapshot to .xlsx or .csv")
+    export_parser.add_argument("date", help="snapshot date, YYYY-MM-DD")
+    export_parser.add_argument("path")
+    subparsers.add_parser("list", help="list the stored snapshot dates")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        print(f"Snapshot written to {import_legacy_file(args.path, args.date, args.dir)}")
+    elif args.command == "export":
+        print(f"Snapshot exported to {export_snapshot(args.date, args.path, directory=args.dir)}")
+    else:
+        for snapshot_date in list_snapshot_dates(args.dir):
+            print(snapshot_date.isoformat())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import datetime
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import pandas as pd
+
+# Default location of the shared work queue; every node must reach the same file (e.g. on a network share)
+DEFAULT_QUEUE_PATH = "work_queue.sqlite3"
+
+# Seconds a lease stays valid without a heartbeat before its symbols go back to other workers
+DEFAULT_LEASE_SECONDS = 300
+
+# Symbols handed out per lease
+DEFAULT_BATCH_SIZE = 10
+
+# Leases a symbol may take before it is marked failed, so one symbol that kills its workers cannot stall the run
+DEFAULT_MAX_ATTEMPTS = 3
+
+# States of a symbol in the queue
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+# Function to build a worker name unique across nodes: host, process and thread
+def worker_name(suffix=None):
+    name = f"{socket.gethostname()}-{os.getpid()}"
+    return f"{name}-{suffix}" if suffix is not None else name
+
+# Symbols handed out to one worker until the lease expires: (lease id, [input rows as dicts])
+class Lease:
+    def __init__(self, lease_id, rows):
+        self.lease_id = lease_id
+        self.rows = rows
+
+# Work queue of symbols shared by the scraper processes of every node, stored in SQLite so it runs without
+# any outside service. Workers lease batches of symbols, heartbeat while they work and write results back;
+# symbols of a lease that was not renewed in time are leased again to the next worker that asks.
+class WorkQueue:
+    def __init__(self, path=DEFAULT_QUEUE_PATH, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        # The rollback journal (not WAL) keeps the file usable from several machines over a network file system;
+        # transactions are opened explicitly so leasing is one atomic read-modify-write
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS symbols (
+            symbol TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            row TEXT NOT NULL,
+            state TEXT NOT NULL,
+            lease_id TEXT,
+            worker TEXT,
+            lease_expires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            result TEXT,
+            finished_at REAL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS symbols_state ON symbols (state, position)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS symbols_lease ON symbols (lease_id)")
+        # Run date the symbols were loaded for, so a queue left from another day is not resumed
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    # Function to run statements in one write transaction
+    def transaction(self, statements):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                results = statements(self.conn)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return results
+
+    # Function to load the symbol universe (the rows of the symbol list) into the queue for a run date (today by
+    # default); symbols already queued for the same date keep their state, so a restarted coordinator resumes the run.
+    # A queue loaded for another date, or `reset`, starts the run over.
+    def load(self, df, run_date=None, reset=False):
+        run_date = (run_date or datetime.date.today()).isoformat()
+        rows = [(row['Symbol'], position, json.dumps(row, ensure_ascii=False, default=str), PENDING) for position, row in enumerate(df.to_dict('records'))]
+
+        def statements(conn):
+            loaded = conn.execute("SELECT value FROM meta WHERE name = 'run_date'").fetchone()
+            if reset or loaded is None or loaded[0] != run_date:
+                conn.execute("DELETE FROM symbols")
+                conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('run_date', ?)", (run_date,))
+            before = conn.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+            conn.executemany("INSERT OR IGNORE INTO symbols (symbol, position, row, state) VALUES (?, ?, ?, ?)", rows)
+            return conn.execute("SELECT COUNT(*) FROM symbols").fetchone()[0] - before
+        return self.transaction(statements)
+
+    # Function to hand the symbols of expired leases back to the queue, inside a write transaction; expired leases
+    # that used up their attempts are given up on
+    def expire_leases(self, conn, now):
+        conn.execute("UPDATE symbols SET state = ?, lease_id = NULL WHERE state = ? AND lease_expires < ? AND attempts >= ?", (FAILED, LEASED, now, self.max_attempts))
+        conn.execute("UPDATE symbols SET state = ?, lease_id = NULL WHERE state = ? AND lease_expires < ?", (PENDING, LEASED, now))
+
+    # Function to reclaim expired leases without leasing, e.g. while no worker is asking for symbols
+    def reclaim_expired(self):
+        self.transaction(lambda conn: self.expire_leases(conn, time.time()))
+
+    # Function to lease up to batch_size symbols that are pending or whose lease expired; returns a Lease or None
+    def lease(self, worker, batch_size=DEFAULT_BATCH_SIZE):
+        now = time.time()
+        lease_id = uuid.uuid4().hex
+
+        def statements(conn):
+            self.expire_leases(conn, now)
+            selected = conn.execute("SELECT symbol, row FROM symbols WHERE state = ? ORDER BY position LIMIT ?", (PENDING, batch_size)).fetchall()
+            conn.executemany("UPDATE symbols SET state = ?, lease_id = ?, worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE symbol = ?", [(LEASED, lease_id, worker, now + self.lease_seconds, symbol) for symbol, _ in selected])
+            return selected
+        selected = self.transaction(statements)
+        return Lease(lease_id, [json.loads(row) for _, row in selected]) if selected else None
+
+    # Function to extend a lease; returns False when it expired and its symbols may already be with another worker
+    def heartbeat(self, lease):
+        def statements(conn):
+            return conn.execute("UPDATE symbols SET lease_expires = ? WHERE lease_id = ? AND state = ?", (time.time() + self.lease_seconds, lease.lease_id, LEASED)).rowcount
+        return self.transaction(statements) > 0
+
+    # Function to write the result row of a symbol back. A result is kept even if the lease expired meanwhile:
+    # the symbol is done, and a worker that leased it again will find it done.
+    def complete(self, lease, symbol, result_row):
+        def statements(conn):
+            conn.execute("UPDATE symbols SET state = ?, lease_id = NULL, result = ?, finished_at = ? WHERE symbol = ? AND state != ?", (DONE, json.dumps(result_row, ensure_ascii=False, default=str), time.time(), symbol, DONE))
+        self.transaction(statements)
+
+    # Function to hand a symbol without a result back to the queue, or mark it failed after max_attempts leases
+    def fail(self, lease, symbol):
+        def statements(conn):
+            conn.execute("UPDATE symbols SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, lease_id = NULL WHERE symbol = ? AND lease_id = ?", (self.max_attempts, FAILED, PENDING, symbol, lease.lease_id))
+        self.transaction(statements)
+
+    # Function to hand the unfinished symbols of a lease back to the queue, e.g. when a worker stops. Symbols the
+    # worker never started do not use up an attempt; one it started but did not finish (its worker died on it)
+    # counts as failed, so a symbol that keeps killing workers ends up failed after max_attempts leases.
+    def release(self, lease, unstarted=()):
+        def statements(conn):
+            conn.executemany("UPDATE symbols SET state = ?, lease_id = NULL, attempts = MAX(attempts - 1, 0) WHERE symbol = ? AND lease_id = ? AND state = ?", [(PENDING, symbol, lease.lease_id, LEASED) for symbol in unstarted])
+            conn.execute("UPDATE symbols SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, lease_id = NULL WHERE lease_id = ? AND state = ?", (self.max_attempts, FAILED, PENDING, lease.lease_id, LEASED))
+        self.transaction(statements)
+
+    # Function to count the symbols in each state
+    def progress(self):
+        with self.lock:
+            counts = dict(self.conn.execute("SELECT state, COUNT(*) FROM symbols GROUP BY state").fetchall())
+        return {state: counts.get(state, 0) for state in (PENDING, LEASED, DONE, FAILED)}
+
+    # Function to tell whether every symbol is done or failed
+    def finished(self):
+        progress = self.progress()
+        return progress[PENDING] == 0 and progress[LEASED] == 0
+
+    # Function to return the symbols of each worker that finished, to see how the work spread across nodes
+    def worker_counts(self):
+        with self.lock:
+            return dict(self.conn.execute("SELECT worker, COUNT(*) FROM symbols WHERE state = ? GROUP BY worker", (DONE,)).fetchall())
+
+    # Function to build the results frame from the result rows, in the order of the symbol list
+    def results_frame(self, columns):
+        with self.lock:
+            results = self.conn.execute("SELECT result FROM symbols WHERE state = ? ORDER BY position", (DONE,)).fetchall()
+        return pd.DataFrame([json.loads(result) for result, in results], columns=columns)
+
+    # Function to return the symbols that failed
+    def failed_symbols(self):
+        with self.lock:
+            return [symbol for symbol, in self.conn.execute("SELECT symbol FROM symbols WHERE state = ? ORDER BY position", (FAILED,)).fetchall()]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+# Command line: show the progress of a work queue
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the progress of a shared scraping work queue.")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_PATH, help="work queue file")
+    args = parser.parse_args(argv)
+
+    queue = WorkQueue(args.queue)
+    print(" ".join(f"{state}={count}" for state, count in queue.progress().items()))
+    for worker, count in sorted(queue.worker_counts().items()):
+        print(f"  {worker}: {count} symbols")
+    failed = queue.failed_symbols()
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+    queue.close()
+
+if __name__ == "__main__":
+    main()